@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Author: unknown
+@Date: 2026-01-18
+@File: audio_cache.py
+"""
+
+import hashlib
+import os
+import time
+from typing import Iterable, Optional
+
+from audio_probe import PROBE_SIZE, AudioInfo, probe_audio, probe_size
+from library import record_local_track
+from mysqlite import SQLiteManager
+from song import Song
+from log_handle import app_logger  # 导入日志配置
+
+# 缓存文件的校验状态
+STATUS_UNVERIFIED = 'unverified'  # 未识别过格式（如升级前的旧缓存），首次使用时校验
+STATUS_VALID = 'valid'
+
+# 淘汰策略
+POLICY_LRU = 'lru'  # 最久未播放的先淘汰
+POLICY_LFU = 'lfu'  # 播放次数最少的先淘汰，次数相同时最久未播放的先淘汰
+
+
+class AudioCache:
+    """
+    边听边存的音频缓存
+    文件以播放 URL 的哈希值命名，不同歌曲不会因歌名歌手相同而互相覆盖；
+    索引保存在 SQLite 中，记录大小、最近播放时间、播放次数和校验状态，
+    总大小超出容量时按播放记录淘汰，收藏夹中的歌曲不会被淘汰
+    """
+    TABLE = 'tb_audio_cache'
+    TEMP_SUFFIXES = ('.part', '.prefetch', '.link')  # 下载或链接中途留下的临时文件
+
+    def __init__(self, cache_dir: str, db_path: str, max_bytes: int = 1024 * 1024 * 1024,
+                 policy: str = POLICY_LRU):
+        """
+        初始化音频缓存
+
+        Args:
+            cache_dir (str): 缓存目录
+            db_path (str): 数据库文件路径（需已执行迁移）
+            max_bytes (int): 缓存容量上限（字节）
+            policy (str): 淘汰策略，POLICY_LRU 或 POLICY_LFU
+        """
+        self.cache_dir = cache_dir
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.logger = app_logger  # 使用全局logger
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._adopt_legacy_files()
+        self._drop_missing()
+
+    @staticmethod
+    def make_key(song: Song) -> str:
+        """播放 URL 的哈希值，没有 URL 时使用歌曲标识"""
+        return hashlib.sha1((song.play_url or song.key).encode('utf-8')).hexdigest()
+
+    def path_for(self, song: Song) -> str:
+        """歌曲的缓存文件路径（不论是否已缓存）"""
+        return os.path.join(self.cache_dir, self.make_key(song) + '.mp3')
+
+    def get(self, song: Song) -> Optional[str]:
+        """
+        查询缓存，未校验过的文件先识别格式，无效时删除
+
+        Args:
+            song (Song): 歌曲信息
+
+        Returns:
+            Optional[str]: 命中时返回本地路径，否则返回None
+        """
+        key = self.make_key(song)
+        entry = SQLiteManager(self.db_path).select_one(self.TABLE, "url_hash = ?", (key,))
+        if entry is None:
+            return None
+        path = entry['file_path']
+        if not os.path.exists(path):
+            # 文件被外部删除
+            self._delete(key, path)
+            return None
+        if entry['status'] != STATUS_VALID and not self._verify(key, path):
+            return None
+        return path
+
+    def touch(self, song: Song):
+        """记录一次播放，作为淘汰的依据"""
+        SQLiteManager(self.db_path).execute_update(
+            f"UPDATE {self.TABLE} SET last_access = ?, play_count = play_count + 1 WHERE url_hash = ?",
+            (time.time(), self.make_key(song)))
+
+    def add(self, song: Song, info: Optional[AudioInfo] = None, keep: Iterable[str] = ()):
+        """
+        登记下载完成的缓存文件，超出容量时淘汰
+
+        Args:
+            song (Song): 歌曲信息
+            info (AudioInfo): 下载时识别出的音频信息，为None时首次使用前再校验
+            keep (Iterable[str]): 不能淘汰的文件路径（正在播放或预加载的歌曲）
+        """
+        key = self.make_key(song)
+        path = self.path_for(song)
+        try:
+            size = os.path.getsize(path)
+        except OSError as e:
+            self.logger.error(f"登记缓存文件失败: {e}")
+            return
+        status = STATUS_VALID if info is not None else STATUS_UNVERIFIED
+        SQLiteManager(self.db_path).execute_update(
+            f"INSERT INTO {self.TABLE} (url_hash, song_key, file_path, size, last_access, status) "
+            f"VALUES (?, ?, ?, ?, ?, ?) "
+            f"ON CONFLICT (url_hash) DO UPDATE SET "
+            f"song_key = excluded.song_key, file_path = excluded.file_path, size = excluded.size, "
+            f"last_access = excluded.last_access, status = excluded.status",
+            (key, song.key, path, size, time.time(), status))
+        # 刚缓存的文件还没有播放记录，LFU 策略下不能立即被淘汰
+        self.evict(list(keep) + [path])
+
+    def total_bytes(self) -> int:
+        """已缓存文件的总大小"""
+        rows = SQLiteManager(self.db_path).execute_query(f"SELECT COALESCE(SUM(size), 0) FROM {self.TABLE}")
+        return rows[0][0]
+
+    def evict(self, keep: Iterable[str] = ()):
+        """
+        总大小超出容量时按淘汰策略删除文件，收藏的歌曲和 keep 中的文件除外
+
+        Args:
+            keep (Iterable[str]): 不能淘汰的文件路径
+        """
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return
+        keep = {os.path.normpath(path) for path in keep if path}
+        order = "play_count, last_access" if self.policy == POLICY_LFU else "last_access"
+        candidates = SQLiteManager(self.db_path).execute_query(
+            f"SELECT url_hash, file_path, size FROM {self.TABLE} "
+            f"WHERE song_key NOT IN (SELECT song_key FROM tb_collect_playlist WHERE song_key IS NOT NULL) "
+            f"ORDER BY {order}")
+        for entry in candidates:
+            if total <= self.max_bytes:
+                break
+            if os.path.normpath(entry['file_path']) in keep:
+                continue
+            try:
+                os.remove(entry['file_path'])
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self.logger.error(f"删除缓存音频失败: {e}")
+                continue
+            self._delete(entry['url_hash'], entry['file_path'])
+            total -= entry['size']
+            self.logger.debug(f"淘汰缓存音频: {entry['file_path']}")
+        if total > self.max_bytes:
+            self.logger.warning(f"音频缓存超出容量但没有可淘汰的文件: {total}/{self.max_bytes} 字节")
+
+    def _verify(self, key: str, path: str) -> bool:
+        """识别文件头的音频格式，有效时标记为已校验，否则删除"""
+        try:
+            with open(path, 'rb') as f:
+                head = f.read(PROBE_SIZE)
+                # 有 ID3 标签时继续读到标签之后的音频帧
+                head += f.read(probe_size(head) - len(head))
+            valid = probe_audio(head, os.path.getsize(path)) is not None
+        except OSError as e:
+            self.logger.error(f"读取缓存音频失败: {e}")
+            return False
+        if valid:
+            SQLiteManager(self.db_path).execute_update(
+                f"UPDATE {self.TABLE} SET status = ? WHERE url_hash = ?", (STATUS_VALID, key))
+            return True
+        self.logger.warning(f"缓存文件不是有效的音频文件，已删除: {path}")
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        self._delete(key, path)
+        return False
+
+    def _delete(self, key: str, path: str):
+        """删除索引，同时从本地曲库中移除"""
+        with SQLiteManager(self.db_path) as db:
+            with db.transaction():
+                db.execute_update(f"DELETE FROM {self.TABLE} WHERE url_hash = ?", (key,))
+                db.execute_update("DELETE FROM tb_local_track WHERE file_path = ?", (path,))
+
+    def _drop_missing(self):
+        """丢弃文件已不存在的索引"""
+        rows = SQLiteManager(self.db_path).execute_query(f"SELECT url_hash, file_path FROM {self.TABLE}")
+        missing = [row for row in rows if not os.path.exists(row['file_path'])]
+        for row in missing:
+            self._delete(row['url_hash'], row['file_path'])
+        if missing:
+            self.logger.info(f"音频缓存索引中 {len(missing)} 个文件已不存在")
+
+    def _adopt_legacy_files(self):
+        """
+        启动时整理缓存目录：
+        不在索引中的缓存文件改为哈希文件名并登记到索引，包括本地曲库中有记录的文件，
+        以及旧版本以“歌名--歌手.mp3”命名、能按文件名对应到收藏歌曲的文件；
+        无法对应到歌曲的 mp3 文件保留不动，上次退出时遗留的临时文件删除
+        """
+        sqlite_manager = SQLiteManager(self.db_path)
+        rows = sqlite_manager.execute_query(
+            f"SELECT * FROM tb_local_track WHERE kind = 'cache' "
+            f"AND file_path NOT IN (SELECT file_path FROM {self.TABLE})")
+        adopted = 0
+        for row in rows:
+            if os.path.exists(row['file_path']) and self._adopt(Song.from_row(row), row['file_path'], row['id']):
+                adopted += 1
+
+        # 旧版本的缓存文件名由歌名和歌手拼成，部分版本会先去掉特殊字符
+        favorites = {}
+        for row in sqlite_manager.execute_query(
+                "SELECT * FROM tb_collect_playlist WHERE play_url IS NOT NULL AND play_url != ''"):
+            song = Song.from_row(row)
+            favorites.setdefault(song.filename, song)
+            favorites.setdefault(song.sanitized().filename, song)
+
+        indexed = {os.path.normpath(row['file_path'])
+                   for row in sqlite_manager.execute_query(f"SELECT file_path FROM {self.TABLE}")}
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if not os.path.isfile(path):
+                continue
+            # .part 为下载中途的临时文件（含预缓存的 .prefetch.part），.link 为硬链接中途的临时文件
+            if name.endswith(self.TEMP_SUFFIXES):
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError as e:
+                    self.logger.error(f"删除缓存目录中的临时文件失败: {e}")
+                continue
+            if name.endswith('.mp3') and os.path.normpath(path) not in indexed and name in favorites:
+                if self._adopt(favorites[name], path):
+                    adopted += 1
+        if adopted:
+            self.logger.info(f"已迁移 {adopted} 个旧缓存文件")
+        if removed:
+            self.logger.info(f"已删除缓存目录中 {removed} 个未完成的临时文件")
+
+    def _adopt(self, song: Song, old_path: str, track_id: Optional[int] = None) -> bool:
+        """
+        把一个缓存文件移动到哈希文件名并登记到索引
+
+        Args:
+            song (Song): 文件对应的歌曲
+            old_path (str): 文件的当前路径
+            track_id (int): 本地曲库中的记录ID，没有记录时为None，迁移后新建记录
+        """
+        new_path = self.path_for(song)
+        sqlite_manager = SQLiteManager(self.db_path)
+        if os.path.normpath(old_path) != os.path.normpath(new_path):
+            try:
+                if os.path.exists(new_path):
+                    # 同一首歌已有哈希文件名的缓存，旧文件是重复的
+                    os.remove(old_path)
+                else:
+                    os.replace(old_path, new_path)
+            except OSError as e:
+                self.logger.error(f"迁移旧缓存文件失败: {e}")
+                return False
+            if track_id is not None:
+                if sqlite_manager.select_one('tb_local_track', "file_path = ?", (new_path,)) is None:
+                    sqlite_manager.execute_update(
+                        "UPDATE tb_local_track SET file_path = ? WHERE id = ?", (new_path, track_id))
+                else:
+                    sqlite_manager.delete_one('tb_local_track', "id = ?", (track_id,))
+        if track_id is None:
+            # 按收藏对应到的文件，登记到本地曲库后才能搜索到
+            record_local_track(self.db_path, song, new_path, 'cache')
+        self.add(song)
+        return True
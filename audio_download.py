@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Author: unknown
+@Date: 2026-01-18
+@File: audio_download.py
+"""
+
+import os
+from typing import Callable, Optional
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+import http_client
+from blob_store import file_hasher
+from audio_probe import AudioInfo, probe_audio, probe_size
+from log_handle import app_logger  # 导入日志配置
+
+CHUNK_SIZE = 64 * 1024  # 每次写入的块大小
+
+
+class InvalidAudioError(Exception):
+    """下载内容不是有效的音频文件（通常是版权保护返回的错误页面）"""
+
+
+class DownloadCancelled(Exception):
+    """下载被取消"""
+
+
+class IncompleteDownloadError(IOError):
+    """连接提前关闭，收到的数据少于响应头声明的大小"""
+
+
+def _parse_total(response, offset: int) -> int:
+    """从响应头解析文件总大小，未知时返回0"""
+    content_range = response.headers.get('Content-Range', '')
+    if '/' in content_range:
+        total = content_range.rsplit('/', 1)[1]
+        return int(total) if total.isdigit() else 0
+    length = int(response.headers.get('Content-Length') or 0)
+    return offset + length if length else 0
+
+
+def _check_head(url: str, head: bytes, total: int, info_callback):
+    """识别文件头的音频格式，不是音频时抛出 InvalidAudioError"""
+    info = probe_audio(head, total)
+    if info is None:
+        raise InvalidAudioError(url)
+    if info_callback is not None:
+        info_callback(info)
+
+
+def stream_download(url: str, dest_path: str,
+                    progress_callback: Optional[Callable[[int, int], None]] = None,
+                    is_cancelled: Optional[Callable[[], bool]] = None,
+                    chunk_size: int = CHUNK_SIZE,
+                    resume: bool = False,
+                    replace_lock=None,
+                    info_callback: Optional[Callable[[AudioInfo], None]] = None,
+                    replaced_callback: Optional[Callable[[int], None]] = None,
+                    hash_callback: Optional[Callable[[str], None]] = None) -> int:
+    """
+    流式下载音频文件
+
+    数据分块写入临时文件，开头的数据先按特征字节和帧头识别音频格式，识别失败立即中止；
+    下载完成后原子重命名为目标文件，内存占用与文件大小无关
+
+    Args:
+        url (str): 音频 URL
+        dest_path (str): 保存路径
+        progress_callback: 进度回调，参数为 (已下载字节数, 总字节数)，总字节数未知时为0
+        is_cancelled: 返回 True 时中止下载
+        chunk_size (int): 块大小
+        resume (bool): 断点续传。存在未完成的临时文件时通过 Range 请求继续下载，
+            并且中止或失败时保留临时文件
+        replace_lock: 重命名临时文件时持有的锁，供同时读取临时文件的一方同步
+        replaced_callback: 重命名完成后、释放 replace_lock 之前的回调，参数为文件的字节数，
+            读取方据此在同一临界区内切换到目标文件
+        info_callback: 识别出音频格式后的回调，参数为 AudioInfo（格式、码率、时长）；续传时不调用
+        hash_callback: 下载完成、重命名之前的回调，参数为文件内容 SHA-1 的十六进制字符串，
+            边下载边计算，调用方无需再读取整个文件
+
+    Returns:
+        int: 文件的字节数
+
+    Raises:
+        InvalidAudioError: 内容不是有效的音频文件
+        DownloadCancelled: 下载被取消
+        IncompleteDownloadError: 下载的数据不完整
+        requests.RequestException: 网络请求失败
+    """
+    os.makedirs(os.path.dirname(dest_path) or '.', exist_ok=True)
+    temp_path = dest_path + '.part'
+    offset = os.path.getsize(temp_path) if resume and os.path.exists(temp_path) else 0
+    # 音频不需要压缩传输，且 Content-Length / Range 需要对应原始字节
+    headers = {'Accept-Encoding': 'identity'}
+    if offset:
+        headers['Range'] = f'bytes={offset}-'
+    downloaded = 0
+    try:
+        with http_client.get(url, stream=True, headers=headers) as response:
+            if offset and response.status_code == 416:
+                # 临时文件已经完整
+                if hash_callback is not None:
+                    hash_callback(file_hasher(temp_path).hexdigest())
+                os.replace(temp_path, dest_path)
+                return offset
+            response.raise_for_status()  # 检查HTTP错误
+            if offset and response.status_code != 206:
+                # 服务器不支持 Range，重新下载
+                offset = 0
+            total = _parse_total(response, offset)
+            downloaded = offset
+            # 续传时先读入已下载的部分
+            digest = None if hash_callback is None else file_hasher(temp_path if offset else '')
+
+            with open(temp_path, 'ab' if offset else 'wb') as f:
+                # 续传时文件头已在首次下载时校验过
+                head = None if offset else b''
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    if is_cancelled is not None and is_cancelled():
+                        raise DownloadCancelled(url)
+                    if not chunk:
+                        continue
+                    if head is not None:
+                        # 先攒够文件头（有 ID3 标签时包括标签之后的音频帧）再校验，校验通过后才开始写盘
+                        head += chunk
+                        if len(head) < probe_size(head):
+                            continue
+                        _check_head(url, head, total, info_callback)
+                        chunk, head = head, None
+                    f.write(chunk)
+                    if digest is not None:
+                        digest.update(chunk)
+                    downloaded += len(chunk)
+                    if progress_callback is not None:
+                        progress_callback(downloaded, total)
+
+                # 文件小于校验长度
+                if head is not None:
+                    _check_head(url, head, total, info_callback)
+                    f.write(head)
+                    if digest is not None:
+                        digest.update(head)
+                    downloaded += len(head)
+                    if progress_callback is not None:
+                        progress_callback(downloaded, total)
+
+            if total and downloaded < total:
+                raise IncompleteDownloadError(f"只收到 {downloaded}/{total} 字节: {url}")
+            if digest is not None:
+                hash_callback(digest.hexdigest())
+
+        if replace_lock is not None:
+            with replace_lock:
+                os.replace(temp_path, dest_path)
+                if replaced_callback is not None:
+                    replaced_callback(downloaded)
+        else:
+            os.replace(temp_path, dest_path)
+            if replaced_callback is not None:
+                replaced_callback(downloaded)
+        return downloaded
+    except BaseException as e:
+        keep_partial = resume and not isinstance(e, InvalidAudioError)
+        if not keep_partial and os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class AudioDownloadThread(QThread):
+    """音频下载的后台线程"""
+    RESULT_OK = 0
+    RESULT_INVALID = 1  # 不是有效的音频文件
+    RESULT_ERROR = 2  # 网络或IO错误
+
+    progress = pyqtSignal(int, int)  # 发射已下载字节数和总字节数
+    download_finished = pyqtSignal(int, str)  # 发射结果代码和错误信息
+
+    def __init__(self, url, dest_path):
+        super().__init__()
+        self.url = url
+        self.dest_path = dest_path
+        self.audio_info = None  # 下载成功后为识别出的 AudioInfo
+        self.content_hash = ''  # 下载成功后为文件内容的哈希
+        self.logger = app_logger  # 使用全局logger
+
+    def cancel(self):
+        """取消下载"""
+        self.requestInterruption()
+
+    def _set_audio_info(self, info):
+        self.audio_info = info
+
+    def _set_content_hash(self, content_hash):
+        self.content_hash = content_hash
+
+    def run(self):
+        """在后台执行下载"""
+        try:
+            size = stream_download(self.url, self.dest_path,
+                                   progress_callback=self.progress.emit,
+                                   is_cancelled=self.isInterruptionRequested,
+                                   info_callback=self._set_audio_info,
+                                   hash_callback=self._set_content_hash)
+            self.logger.info(f"音频下载完成: {self.dest_path}, {size} 字节")
+            self.download_finished.emit(self.RESULT_OK, "")
+        except InvalidAudioError:
+            self.logger.warning(f"下载的文件不是有效的音频文件: {self.url}")
+            self.download_finished.emit(self.RESULT_INVALID, "")
+        except DownloadCancelled:
+            self.logger.info(f"音频下载已取消: {self.url}")
+            self.download_finished.emit(self.RESULT_ERROR, "下载已取消")
+        except Exception as e:
+            self.logger.error(f"音频下载失败: {e}, URL: {self.url}")
+            self.download_finished.emit(self.RESULT_ERROR, str(e))
@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Author: unknown
+@Date: 2026-01-18
+@File: audio_probe.py
+"""
+
+import struct
+from typing import NamedTuple, Optional
+
+PROBE_SIZE = 8192  # 识别格式需要的文件头长度（不含 ID3v2 标签）
+MAX_TAG_SIZE = 16 * 1024 * 1024  # 为跳过 ID3v2 标签最多缓冲的字节数
+
+# MPEG 音频帧头的码率表（kbps），键为 (是否 MPEG1, 层)
+_MP3_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# 版本位 -> 采样率表（01 为保留值）
+_MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+_AAC_SAMPLE_RATES = (96000, 88200, 64000, 48000, 44100, 32000, 24000, 22050,
+                     16000, 12000, 11025, 8000, 7350)
+
+_MIME_TYPES = {
+    'mp3': 'audio/mpeg',
+    'aac': 'audio/aac',
+    'm4a': 'audio/mp4',
+    'flac': 'audio/flac',
+    'ogg': 'audio/ogg',
+    'wav': 'audio/wav',
+}
+
+
+class AudioInfo(NamedTuple):
+    """从文件头识别出的音频信息，未知的数值为0"""
+    format: str
+    bitrate: int = 0  # kbps
+    sample_rate: int = 0
+    duration: float = 0.0  # 秒
+
+    @property
+    def mime_type(self) -> str:
+        return _MIME_TYPES.get(self.format, 'application/octet-stream')
+
+
+def _estimate_duration(size: int, bitrate: int) -> float:
+    return size * 8 / (bitrate * 1000) if size > 0 and bitrate else 0.0
+
+
+def _mp3_frame(data: bytes, pos: int):
+    """
+    解析 pos 处的 MPEG 音频帧头
+
+    Returns:
+        Optional[tuple]: (帧长度, 码率, 采样率, 每帧采样数, 是否 MPEG1, 是否单声道)，不是有效帧头时返回None
+    """
+    if pos + 4 > len(data) or data[pos] != 0xFF or data[pos + 1] & 0xE0 != 0xE0:
+        return None
+    version = (data[pos + 1] >> 3) & 0x03
+    layer = 4 - ((data[pos + 1] >> 1) & 0x03)
+    bitrate_index = data[pos + 2] >> 4
+    rate_index = (data[pos + 2] >> 2) & 0x03
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    mpeg1 = version == 3
+    bitrate = _MP3_BITRATES[(mpeg1, layer)][bitrate_index]
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    padding = (data[pos + 2] >> 1) & 0x01
+    mono = (data[pos + 3] >> 6) == 3
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate * 1000 // sample_rate + padding) * 4
+    else:
+        samples = 1152 if mpeg1 or layer == 2 else 576
+        length = samples // 8 * bitrate * 1000 // sample_rate + padding
+    return length, bitrate, sample_rate, samples, mpeg1, mono
+
+
+def _id3_end(data: bytes) -> int:
+    """文件开头的 ID3v2 标签的结束位置，没有标签时返回0"""
+    if data[:3] != b'ID3' or len(data) < 10:
+        return 0
+    # ID3v2 标签长度为 4 个 7 位字节
+    size = 0
+    for byte in data[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    return 10 + size + (10 if data[5] & 0x10 else 0)
+
+
+def probe_size(head: bytes) -> int:
+    """
+    识别格式需要的文件头长度
+    ID3v2 标签（通常含封面图片）可能比 PROBE_SIZE 还长，此时需要读到标签之后的音频帧
+
+    Args:
+        head (bytes): 已读取的文件头，至少 10 字节时才能识别标签长度
+
+    Returns:
+        int: 需要的字节数
+    """
+    tag_end = _id3_end(head)
+    return min(tag_end, MAX_TAG_SIZE) + PROBE_SIZE
+
+
+def _probe_mp3(data: bytes, total_size: int) -> Optional[AudioInfo]:
+    start = _id3_end(data)
+    has_id3 = start > 0
+    if has_id3:
+        if total_size and total_size <= start:
+            return None  # 只有标签没有音频帧
+        if start >= len(data):
+            # 文件头没有读到标签之后的音频帧，无法确认是 MP3
+            return None
+
+    # 在文件头内寻找连续两个有效帧，避免把随机二进制数据误认为 MP3
+    end = len(data) - 4
+    pos = start
+    while pos <= end:
+        pos = data.find(b'\xff', pos, end + 1)
+        if pos < 0:
+            break
+        frame = _mp3_frame(data, pos)
+        if frame is not None:
+            length, bitrate, sample_rate, samples, mpeg1, mono = frame
+            following = _mp3_frame(data, pos + length)
+            if following is not None or (pos + length >= len(data) and (has_id3 or pos == 0)):
+                duration = _estimate_duration(total_size - pos, bitrate) if total_size else 0.0
+                # VBR 文件的第一帧是 Xing/Info 帧，记录了总帧数
+                side_info = (32 if not mono else 17) if mpeg1 else (17 if not mono else 9)
+                tag = pos + 4 + side_info
+                if data[tag:tag + 4] in (b'Xing', b'Info') and len(data) >= tag + 12:
+                    flags = struct.unpack('>I', data[tag + 4:tag + 8])[0]
+                    if flags & 0x01:
+                        frames = struct.unpack('>I', data[tag + 8:tag + 12])[0]
+                        duration = frames * samples / sample_rate
+                        if total_size and duration:
+                            bitrate = int((total_size - pos) * 8 / duration / 1000)
+                return AudioInfo('mp3', bitrate, sample_rate, duration)
+        pos += 1
+        if not has_id3 and pos > 4096:
+            # 没有 ID3 标签的文件，帧应该从开头附近开始
+            break
+    return None
+
+
+def _probe_adts(data: bytes, total_size: int) -> Optional[AudioInfo]:
+    """ADTS 封装的 AAC"""
+    if len(data) < 7 or data[0] != 0xFF or data[1] & 0xF6 != 0xF0:
+        return None
+    rate_index = (data[2] >> 2) & 0x0F
+    if rate_index >= len(_AAC_SAMPLE_RATES):
+        return None
+    length = ((data[3] & 0x03) << 11) | (data[4] << 3) | (data[5] >> 5)
+    if length < 7:
+        return None
+    if length + 2 <= len(data) and (data[length] != 0xFF or data[length + 1] & 0xF6 != 0xF0):
+        return None
+    sample_rate = _AAC_SAMPLE_RATES[rate_index]
+    bitrate = length * 8 * sample_rate // 1024 // 1000
+    return AudioInfo('aac', bitrate, sample_rate, _estimate_duration(total_size, bitrate))
+
+
+def _probe_flac(data: bytes, total_size: int) -> Optional[AudioInfo]:
+    if data[:4] != b'fLaC':
+        return None
+    if len(data) < 26 or data[4] & 0x7F != 0:
+        # 第一个元数据块必须是 STREAMINFO
+        return AudioInfo('flac') if len(data) < 26 else None
+    sample_rate = int.from_bytes(data[18:21], 'big') >> 4
+    total_samples = int.from_bytes(data[21:26], 'big') & 0xFFFFFFFFF
+    duration = total_samples / sample_rate if sample_rate and total_samples else 0.0
+    bitrate = int(total_size * 8 / duration / 1000) if total_size and duration else 0
+    return AudioInfo('flac', bitrate, sample_rate, duration)
+
+
+def _probe_ogg(data: bytes, total_size: int) -> Optional[AudioInfo]:
+    if data[:4] != b'OggS' or len(data) < 27:
+        return None
+    packet = data[27 + data[26]:]
+    if packet[:7] == b'\x01vorbis' and len(packet) >= 24:
+        sample_rate, _, nominal = struct.unpack('<Iii', packet[12:24])
+        bitrate = max(nominal, 0) // 1000
+        return AudioInfo('ogg', bitrate, sample_rate, _estimate_duration(total_size, bitrate))
+    if packet[:8] == b'OpusHead' and len(packet) >= 16:
+        return AudioInfo('ogg', 0, struct.unpack('<I', packet[12:16])[0])
+    return AudioInfo('ogg')
+
+
+def _probe_mp4(data: bytes, total_size: int) -> Optional[AudioInfo]:
+    if data[4:8] != b'ftyp':
+        return None
+    # moov 在文件头时可以读到时长，否则只能确认格式
+    pos = data.find(b'mvhd')
+    duration = 0.0
+    if pos >= 0 and len(data) > pos + 4:
+        timescale = length = 0
+        if data[pos + 4] == 1 and len(data) >= pos + 36:
+            timescale, length = struct.unpack('>IQ', data[pos + 24:pos + 36])
+        elif data[pos + 4] == 0 and len(data) >= pos + 24:
+            timescale, length = struct.unpack('>II', data[pos + 16:pos + 24])
+        duration = length / timescale if timescale else 0.0
+    bitrate = int(total_size * 8 / duration / 1000) if total_size and duration else 0
+    return AudioInfo('m4a', bitrate, 0, duration)
+
+
+def _probe_wav(data: bytes, total_size: int) -> Optional[AudioInfo]:
+    if data[:4] != b'RIFF' or data[8:12] != b'WAVE' or len(data) < 32:
+        return None
+    sample_rate, byte_rate = struct.unpack('<II', data[24:32])
+    bitrate = byte_rate * 8 // 1000
+    return AudioInfo('wav', bitrate, sample_rate, _estimate_duration(total_size - 44, bitrate))
+
+
+def probe_audio(data: bytes, total_size: int = 0) -> Optional[AudioInfo]:
+    """
+    根据文件头的特征字节和帧头识别音频格式
+
+    Args:
+        data (bytes): 文件开头的数据，建议至少 probe_size(data) 字节
+        total_size (int): 文件总大小，用于估算时长或码率，未知时为0
+
+    Returns:
+        Optional[AudioInfo]: 音频信息，不是可识别的音频时返回None
+    """
+    if not data:
+        return None
+    for probe in (_probe_flac, _probe_ogg, _probe_mp4, _probe_wav, _probe_adts, _probe_mp3):
+        info = probe(data, total_size)
+        if info is not None:
+            return info
+    return None
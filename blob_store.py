@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Author: unknown
+@Date: 2026-01-18
+@File: blob_store.py
+"""
+
+import hashlib
+import os
+import shutil
+
+from library import find_local_files
+from log_handle import app_logger  # 导入日志配置
+
+logger = app_logger  # 使用全局logger
+
+CHUNK_SIZE = 1024 * 1024  # 计算哈希时每次读取的大小
+
+
+def file_hasher(path: str = ''):
+    """
+    计算内容哈希的 SHA-1 对象，给出 path 时先读入该文件的内容，之后可以继续追加数据
+
+    Args:
+        path (str): 已有的文件，为空时返回空的哈希对象
+    """
+    digest = hashlib.sha1()
+    if path:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+    return digest
+
+
+def link_file(src: str, dest: str, copy_fallback: bool = True) -> bool:
+    """
+    让 dest 与 src 共用同一份数据：优先创建硬链接，文件系统不支持时复制
+
+    Args:
+        src (str): 已有的文件
+        dest (str): 目标路径，已存在时被原子替换
+        copy_fallback (bool): 不能创建硬链接时是否复制，为 False 时保持 dest 不变
+
+    Returns:
+        bool: 是否为硬链接（False 表示复制或未修改）
+    """
+    os.makedirs(os.path.dirname(dest) or '.', exist_ok=True)
+    temp_path = dest + '.link'
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    try:
+        os.link(src, temp_path)
+        linked = True
+    except OSError:
+        # 跨分区或文件系统不支持硬链接
+        if not copy_fallback:
+            return False
+        shutil.copyfile(src, temp_path)
+        linked = False
+    os.replace(temp_path, dest)
+    return linked
+
+
+def deduplicate(db_path: str, file_path: str, content_hash: str):
+    """
+    本地曲库中已有内容相同的文件时，把新文件换成它的硬链接
+    内容哈希由下载线程边下载边计算，这里不再读取文件内容，可以在界面线程中调用
+
+    Args:
+        db_path (str): 数据库文件路径
+        file_path (str): 刚下载或缓存完成的文件
+        content_hash (str): 新文件内容 SHA-1 的十六进制字符串，为空时不处理
+    """
+    if not content_hash:
+        return
+    try:
+        size = os.path.getsize(file_path)
+    except OSError as e:
+        logger.error(f"读取文件大小失败: {e}, 文件: {file_path}")
+        return
+    for other in find_local_files(db_path, content_hash):
+        if other == file_path or not os.path.exists(other):
+            continue
+        try:
+            if os.path.samefile(other, file_path):
+                break
+            # 数据库中的哈希在文件写入时记录，大小不同说明文件已被修改，不能链接
+            if os.path.getsize(other) != size:
+                continue
+            if link_file(other, file_path, copy_fallback=False):
+                logger.info(f"内容相同的文件已改为硬链接: {file_path} -> {other}")
+        except OSError as e:
+            logger.error(f"合并重复文件失败: {e}, 文件: {file_path}")
+        break
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Author: unknown
+@Date: 2026-01-18
+@File: cover_cache.py
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+from utils import download_image
+from log_handle import app_logger  # 导入日志配置
+
+
+class CoverCache:
+    """
+    封面图片磁盘缓存
+    以 URL 的哈希值作为文件名，索引文件记录大小和最近访问时间，超出容量时按 LRU 淘汰
+    """
+    INDEX_FILE = 'index.json'
+    IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.webp', '.gif'}
+
+    def __init__(self, cache_dir: str, max_bytes: int = 100 * 1024 * 1024, save_interval: int = 20):
+        """
+        初始化封面缓存
+
+        Args:
+            cache_dir (str): 缓存目录
+            max_bytes (int): 缓存容量上限（字节）
+            save_interval (int): 每累计多少次修改写一次索引文件
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.save_interval = save_interval
+        self.logger = app_logger  # 使用全局logger
+
+        self._lock = threading.Lock()
+        self._entries = {}  # key -> {"url", "file", "size", "last_access"}
+        self._total_bytes = 0
+        self._dirty = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def make_key(url: str) -> str:
+        """URL 的哈希值"""
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def _file_name(self, url: str, key: str) -> str:
+        suffix = os.path.splitext(urlsplit(url).path)[1].lower()
+        if suffix not in self.IMAGE_SUFFIXES:
+            suffix = '.img'
+        return key + suffix
+
+    def get(self, url: str) -> Optional[str]:
+        """
+        查询缓存
+
+        Args:
+            url (str): 图片 URL
+
+        Returns:
+            Optional[str]: 命中时返回本地路径，否则返回None
+        """
+        key = self.make_key(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            path = os.path.join(self.cache_dir, entry['file'])
+            if not os.path.exists(path):
+                # 文件被外部删除
+                self._total_bytes -= entry['size']
+                del self._entries[key]
+                self._mark_dirty()
+                return None
+            entry['last_access'] = time.time()
+            self._mark_dirty()
+            return path
+
+    def fetch(self, url: str) -> Optional[str]:
+        """
+        获取图片本地路径，未缓存时下载
+
+        Args:
+            url (str): 图片 URL
+
+        Returns:
+            Optional[str]: 本地路径，下载失败时返回None
+        """
+        path = self.get(url)
+        if path is not None:
+            return path
+
+        key = self.make_key(url)
+        file_name = self._file_name(url, key)
+        path = os.path.join(self.cache_dir, file_name)
+        temp_path = f"{path}.{threading.get_ident()}.part"
+        if not download_image(url, temp_path):
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return None
+        os.replace(temp_path, path)
+        self._add(key, url, file_name, os.path.getsize(path))
+        return path
+
+    def _add(self, key, url, file_name, size):
+        """登记新文件，超出容量时淘汰最久未访问的条目"""
+        with self._lock:
+            old = self._entries.get(key)
+            if old is not None:
+                self._total_bytes -= old['size']
+            self._entries[key] = {'url': url, 'file': file_name, 'size': size, 'last_access': time.time()}
+            self._total_bytes += size
+            self._evict()
+            self._mark_dirty()
+
+    def _evict(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+        for key, entry in sorted(self._entries.items(), key=lambda kv: kv[1]['last_access']):
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, entry['file']))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self.logger.error(f"删除缓存封面失败: {e}")
+                continue
+            self._total_bytes -= entry['size']
+            del self._entries[key]
+            self.logger.debug(f"淘汰缓存封面: {entry['url']}")
+
+    def _mark_dirty(self):
+        """记录修改次数，累计到一定数量时写入索引（调用方需持有锁）"""
+        self._dirty += 1
+        if self._dirty >= self.save_interval:
+            self._save_index()
+
+    def _load_index(self):
+        """读取索引文件，丢弃文件已不存在的条目"""
+        index_path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        if not os.path.exists(index_path):
+            return
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.error(f"读取封面缓存索引失败: {e}")
+            return
+        for key, entry in entries.items():
+            if os.path.exists(os.path.join(self.cache_dir, entry['file'])):
+                self._entries[key] = entry
+                self._total_bytes += entry['size']
+        self.logger.info(f"封面缓存索引已加载: {len(self._entries)} 个文件, {self._total_bytes} 字节")
+
+    def _save_index(self):
+        """原子写入索引文件（调用方需持有锁）"""
+        index_path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        temp_path = index_path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(temp_path, index_path)
+            self._dirty = 0
+        except OSError as e:
+            self.logger.error(f"写入封面缓存索引失败: {e}")
+
+    def close(self):
+        """保存索引文件"""
+        with self._lock:
+            self._save_index()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Author: unknown
+@Date: 2026-01-18
+@File: cover_pool.py
+"""
+
+import itertools
+import queue
+import threading
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from log_handle import app_logger  # 导入日志配置
+
+
+class CoverDownloadPool(QObject):
+    """
+    封面图片下载线程池
+    固定数量的工作线程 + 优先级队列，相同 URL 只下载一次，新搜索时可取消未开始的任务
+    """
+    download_finished = pyqtSignal(int, str, str)  # 发射信号，包含行号、图片 URL 和图片路径
+    download_failed = pyqtSignal(int, str)  # 行号、图片 URL
+
+    def __init__(self, cover_cache, max_workers=4, parent=None):
+        """
+        初始化线程池
+
+        Args:
+            cover_cache (CoverCache): 封面磁盘缓存
+            max_workers (int): 最大并发下载数
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.cover_cache = cover_cache
+        self.max_workers = max_workers
+        self.logger = app_logger  # 使用全局logger
+
+        self._queue = queue.PriorityQueue()
+        self._counter = itertools.count()  # 同优先级时按提交顺序
+        self._lock = threading.Lock()
+        self._pending = {}  # url -> [priority, set(rows)]，排队中的任务
+        self._running = {}  # url -> set(rows)，正在下载的任务
+        self._generation = 0
+        self._stopped = False
+
+        self._workers = []
+        for i in range(max_workers):
+            worker = threading.Thread(target=self._work, name=f"cover-download-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, url, row=-1, priority=0):
+        """
+        提交下载任务
+
+        Args:
+            url (str): 图片 URL
+            row (int): 结果表格中的行号，-1 表示仅下载不通知
+            priority (int): 优先级，数值越小越先下载
+        """
+        if not url or self._stopped:
+            return
+        with self._lock:
+            if url in self._running:
+                # 正在下载，完成后一并通知
+                self._running[url].add(row)
+                return
+            entry = self._pending.get(url)
+            if entry is not None:
+                entry[1].add(row)
+                if priority >= entry[0]:
+                    return
+                # 提升优先级：重新入队，旧的队列项出队时会被忽略
+                entry[0] = priority
+            else:
+                self._pending[url] = [priority, {row}]
+            self._queue.put((priority, next(self._counter), self._generation, url))
+
+    def cancel_all(self):
+        """取消所有尚未开始的任务，正在下载的任务完成后不再通知"""
+        with self._lock:
+            self._generation += 1
+            self._pending.clear()
+            self._running = {url: set() for url in self._running}
+        self.logger.debug("已取消所有未完成的封面下载任务")
+
+    def shutdown(self, timeout=5):
+        """停止所有工作线程"""
+        self.cancel_all()
+        self._stopped = True
+        for _ in self._workers:
+            self._queue.put((float('inf'), next(self._counter), -1, None))
+        for worker in self._workers:
+            worker.join(timeout)
+        self.logger.debug("封面下载线程池已停止")
+
+    def _work(self):
+        """工作线程主循环"""
+        while True:
+            priority, _, generation, url = self._queue.get()
+            if url is None:
+                return
+            with self._lock:
+                entry = self._pending.get(url)
+                # 已取消或是被提升优先级后遗留的重复项
+                if generation != self._generation or entry is None or entry[0] != priority:
+                    continue
+                del self._pending[url]
+                self._running[url] = entry[1]
+
+            try:
+                image_path = self.cover_cache.fetch(url)
+            except Exception as e:
+                self.logger.error(f"下载图片失败: {e}, URL: {url}")
+                image_path = None
+
+            with self._lock:
+                rows = self._running.pop(url, set())
+            if image_path is None:
+                for row in sorted(rows):
+                    if row >= 0:
+                        self.download_failed.emit(row, url)
+                continue
+            self.logger.debug(f"封面已就绪: {image_path}")
+            for row in sorted(rows):
+                if row >= 0:
+                    self.download_finished.emit(row, url, image_path)
@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Author: unknown
+@Date: 2026-01-18
+@File: download_manager.py
+"""
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from audio_download import DownloadCancelled, InvalidAudioError, stream_download
+from audio_probe import AudioInfo
+from mysqlite import SQLiteManager
+from log_handle import app_logger  # 导入日志配置
+
+# 任务状态
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_PAUSED = 'paused'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+STATUS_CANCELLED = 'cancelled'
+
+
+class DownloadManager(QObject):
+    """
+    后台下载管理器
+    任务队列持久化在 SQLite 中，多个工作线程并发下载，支持暂停、取消、重试和断点续传
+    """
+    job_added = pyqtSignal(int)  # 任务ID
+    job_progress = pyqtSignal(int, int, int, float, float)  # 任务ID、已下载字节、总字节、速度(字节/秒)、剩余秒数
+    job_status_changed = pyqtSignal(int, str, str)  # 任务ID、新状态、说明
+
+    PROGRESS_INTERVAL = 0.5  # 进度信号的最小间隔（秒）
+    SAVE_INTERVAL = 2.0  # 进度写入数据库的最小间隔（秒）
+    TABLE = 'tb_download_job'  # 由 migrations 创建
+
+    def __init__(self, db_path: str, max_workers: int = 2, parent=None):
+        """
+        初始化下载管理器
+
+        Args:
+            db_path (str): 数据库文件路径（需已执行迁移）
+            max_workers (int): 并发下载数
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.db_path = db_path
+        self.max_workers = max_workers
+        self.table = self.TABLE
+        self.logger = app_logger  # 使用全局logger
+
+        self._condition = threading.Condition()
+        self._controls: Dict[int, str] = {}  # 运行中的任务ID -> 请求的状态（暂停/取消）
+        self._audio_info: Dict[int, AudioInfo] = {}  # 任务ID -> 下载时识别出的音频信息
+        self._content_hash: Dict[int, str] = {}  # 任务ID -> 下载时计算的内容哈希
+        self._stopped = False
+
+        sqlite_manager = SQLiteManager(self.db_path)
+        # 上次退出时仍在下载的任务重新排队，已下载的部分会续传
+        sqlite_manager.execute_update(f"UPDATE {self.table} SET status = ? WHERE status = ?",
+                                      (STATUS_QUEUED, STATUS_RUNNING))
+
+        self._workers = []
+        for i in range(max_workers):
+            worker = threading.Thread(target=self._work, name=f"music-download-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def enqueue(self, url: str, dest_path: str, title: str = "", author: str = "") -> int:
+        """
+        添加下载任务，同一保存路径已有未完成的任务时直接返回该任务
+
+        Args:
+            url (str): 音频 URL
+            dest_path (str): 保存路径
+            title (str): 歌名
+            author (str): 歌手
+
+        Returns:
+            int: 任务ID
+        """
+        with self._condition:
+            sqlite_manager = SQLiteManager(self.db_path)
+            existing = sqlite_manager.select_one(
+                self.table, "dest_path = ? AND status IN (?, ?, ?)",
+                (dest_path, STATUS_QUEUED, STATUS_RUNNING, STATUS_PAUSED))
+            if existing is not None:
+                return existing['id']
+            job_id = sqlite_manager.insert_one(self.table, {
+                'url': url,
+                'title': title,
+                'author': author,
+                'dest_path': dest_path,
+                'status': STATUS_QUEUED,
+            })
+            self._condition.notify()
+        self.logger.info(f"添加下载任务: {title} - {author}, ID: {job_id}")
+        self.job_added.emit(job_id)
+        return job_id
+
+    def pause(self, job_id: int):
+        """暂停任务，已下载的部分保留用于续传"""
+        self._request(job_id, STATUS_PAUSED)
+
+    def cancel(self, job_id: int):
+        """取消任务并删除已下载的部分"""
+        self._request(job_id, STATUS_CANCELLED)
+
+    def resume(self, job_id: int):
+        """继续已暂停的任务"""
+        self._requeue(job_id, (STATUS_PAUSED,))
+
+    def retry(self, job_id: int):
+        """重试失败或已取消的任务"""
+        self._requeue(job_id, (STATUS_FAILED, STATUS_CANCELLED))
+
+    def job_ids(self, *statuses: str) -> List[int]:
+        """查询指定状态的任务ID，按添加顺序排列"""
+        placeholders = ', '.join(['?' for _ in statuses])
+        rows = SQLiteManager(self.db_path).select_all(
+            self.table, f"status IN ({placeholders})", tuple(statuses), order_by='id')
+        return [row['id'] for row in rows]
+
+    def get_job(self, job_id: int):
+        """查询任务"""
+        return SQLiteManager(self.db_path).select_one(self.table, "id = ?", (job_id,))
+
+    def pop_audio_info(self, job_id: int) -> Optional[AudioInfo]:
+        """取出任务下载时识别出的音频信息（续传的任务没有）"""
+        return self._audio_info.pop(job_id, None)
+
+    def pop_content_hash(self, job_id: int) -> str:
+        """取出已完成任务下载时计算的内容哈希，没有时返回空字符串"""
+        return self._content_hash.pop(job_id, '')
+
+    def counts(self) -> Dict[str, int]:
+        """各状态的任务数"""
+        rows = SQLiteManager(self.db_path).execute_query(
+            f"SELECT status, COUNT(*) AS total FROM {self.table} GROUP BY status")
+        return {row['status']: row['total'] for row in rows}
+
+    def shutdown(self, timeout: float = 5):
+        """停止所有工作线程，正在下载的任务保留进度，下次启动时续传"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        for worker in self._workers:
+            worker.join(timeout)
+        self.logger.debug("下载管理器已停止")
+
+    def _request(self, job_id: int, status: str):
+        """暂停或取消任务：运行中的任务由工作线程处理，排队中的任务直接修改状态"""
+        with self._condition:
+            if job_id in self._controls:
+                self._controls[job_id] = status
+                return
+            job = self.get_job(job_id)
+            if job is None or job['status'] not in (STATUS_QUEUED, STATUS_PAUSED):
+                return
+            self._set_status(job_id, status)
+        if status == STATUS_CANCELLED:
+            self._remove_partial(job['dest_path'])
+        self.job_status_changed.emit(job_id, status, "")
+
+    def _requeue(self, job_id: int, from_status):
+        with self._condition:
+            job = self.get_job(job_id)
+            if job is None or job['status'] not in from_status:
+                return
+            self._set_status(job_id, STATUS_QUEUED)
+            self._condition.notify()
+        self.job_status_changed.emit(job_id, STATUS_QUEUED, "")
+
+    def _set_status(self, job_id: int, status: str, error: str = ""):
+        SQLiteManager(self.db_path).execute_update(
+            f"UPDATE {self.table} SET status = ?, error = ? WHERE id = ?", (status, error, job_id))
+
+    @staticmethod
+    def _remove_partial(dest_path: str):
+        temp_path = dest_path + '.part'
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    def _claim_next(self) -> Optional[dict]:
+        """取出最早排队的任务并标记为运行中，没有任务时阻塞等待"""
+        with self._condition:
+            while not self._stopped:
+                sqlite_manager = SQLiteManager(self.db_path)
+                job = sqlite_manager.select_all(self.table, "status = ?", (STATUS_QUEUED,),
+                                                order_by='id', limit=1)
+                if job:
+                    job = dict(job[0])
+                    self._set_status(job['id'], STATUS_RUNNING)
+                    self._controls[job['id']] = STATUS_RUNNING
+                    return job
+                self._condition.wait()
+            return None
+
+    def _work(self):
+        """工作线程主循环"""
+        while True:
+            job = self._claim_next()
+            if job is None:
+                return
+            self.job_status_changed.emit(job['id'], STATUS_RUNNING, "")
+            status, error = self._download(job)
+            with self._condition:
+                self._controls.pop(job['id'], None)
+                self._set_status(job['id'], status, error)
+            if status in (STATUS_FAILED, STATUS_CANCELLED):
+                # 暂停的任务保留，续传完成后仍可取出
+                self._audio_info.pop(job['id'], None)
+                self._content_hash.pop(job['id'], None)
+            if status == STATUS_CANCELLED:
+                self._remove_partial(job['dest_path'])
+            self.job_status_changed.emit(job['id'], status, error)
+
+    def _download(self, job: dict):
+        """
+        执行单个下载任务
+
+        Returns:
+            Tuple[str, str]: 任务的最终状态和错误信息
+        """
+        job_id = job['id']
+        start_time = time.monotonic()
+        state = {'start_bytes': None, 'emit_time': 0.0, 'save_time': start_time}
+
+        def is_cancelled():
+            return self._stopped or self._controls.get(job_id) != STATUS_RUNNING
+
+        def on_info(info):
+            self._audio_info[job_id] = info
+
+        def on_hash(content_hash):
+            self._content_hash[job_id] = content_hash
+
+        def on_progress(downloaded, total):
+            now = time.monotonic()
+            if state['start_bytes'] is None:
+                state['start_bytes'] = downloaded
+            if now - state['emit_time'] >= self.PROGRESS_INTERVAL or downloaded == total:
+                elapsed = max(now - start_time, 1e-6)
+                speed = (downloaded - state['start_bytes']) / elapsed
+                eta = (total - downloaded) / speed if total and speed > 0 else -1.0
+                self.job_progress.emit(job_id, downloaded, total, speed, eta)
+                state['emit_time'] = now
+            if now - state['save_time'] >= self.SAVE_INTERVAL:
+                SQLiteManager(self.db_path).execute_update(
+                    f"UPDATE {self.table} SET downloaded_bytes = ?, total_bytes = ? WHERE id = ?",
+                    (downloaded, total, job_id))
+                state['save_time'] = now
+
+        try:
+            size = stream_download(job['url'], job['dest_path'],
+                                   progress_callback=on_progress,
+                                   is_cancelled=is_cancelled,
+                                   resume=True,
+                                   info_callback=on_info,
+                                   hash_callback=on_hash)
+            SQLiteManager(self.db_path).execute_update(
+                f"UPDATE {self.table} SET downloaded_bytes = ?, total_bytes = ? WHERE id = ?",
+                (size, size, job_id))
+            self.logger.info(f"下载完成: {job['dest_path']}")
+            return STATUS_DONE, ""
+        except InvalidAudioError:
+            self.logger.warning(f"下载的文件不是有效的音频文件: {job['url']}")
+            return STATUS_FAILED, "版权保护，无法下载"
+        except DownloadCancelled:
+            if self._stopped:
+                return STATUS_QUEUED, ""
+            return self._controls.get(job_id, STATUS_CANCELLED), ""
+        except Exception as e:
+            self.logger.error(f"下载失败: {e}, URL: {job['url']}")
+            return STATUS_FAILED, str(e)
@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Author: unknown
+@Date: 2026-01-18
+@File: favorites_model.py
+"""
+
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from PyQt5 import QtCore
+from PyQt5.QtCore import pyqtSignal
+
+from library import fetch_favorites_between
+from loading_thread import LoadingPlaylistThread
+from song import Song
+from log_handle import app_logger  # 导入日志配置
+
+
+class FavoritesModel(QtCore.QAbstractListModel):
+    """
+    收藏列表的数据模型
+    视图滚动到末尾时通过 canFetchMore/fetchMore 在后台线程按页加载；
+    所有已加载行只保存收藏ID（紧凑数组），记录本身只在内存中保留最近显示的一部分，
+    被淘汰的记录在再次显示时按 ID 范围从数据库重新读取
+    """
+    load_failed = pyqtSignal()
+
+    def __init__(self, db_path: str, page_size: int = 200, max_records: int = 1000, parent=None):
+        """
+        初始化数据模型
+
+        Args:
+            db_path (str): 数据库文件路径
+            page_size (int): 每次加载的条数
+            max_records (int): 内存中最多保留的记录数
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.db_path = db_path
+        self.page_size = page_size
+        self.max_records = max(max_records, page_size)
+        self.logger = app_logger  # 使用全局logger
+
+        self._ids = array('q')  # 按顺序排列的收藏ID
+        self._records = OrderedDict()  # 收藏ID -> Song（LRU）
+        self._deleted = set()  # 加载期间已删除的收藏，晚到的分页数据中需要跳过
+        self._pending = {}  # 尚未加载到的位置发生的变更，收藏ID -> Song
+        self._exhausted = False
+        self._placeholder = None  # 没有数据时显示的提示
+        self._generation = 0
+        self._loading = None
+        self._threads = []
+
+    def reload(self):
+        """清空并重新加载"""
+        self._generation += 1
+        self._cancel_threads()
+        self.beginResetModel()
+        self._ids = array('q')
+        self._records.clear()
+        self._deleted = set()
+        self._pending = {}
+        self._exhausted = False
+        self._loading = None
+        self._placeholder = "加载中..."
+        self.endResetModel()
+        self.fetchMore()
+
+    def record(self, row: int) -> Optional[Song]:
+        """第 row 行的记录，提示行或越界时返回None"""
+        if not 0 <= row < len(self._ids):
+            return None
+        item_id = self._ids[row]
+        song = self._records.get(item_id)
+        if song is None:
+            song = self._refill(row)
+        else:
+            self._records.move_to_end(item_id)
+        return song
+
+    def records(self, start: int, count: int) -> List[Song]:
+        """从第 start 行开始最多 count 条已加载的记录"""
+        end = min(len(self._ids), start + count)
+        songs = (self.record(row) for row in range(max(start, 0), end))
+        return [song for song in songs if song is not None]
+
+    def count(self) -> int:
+        """已加载的收藏数"""
+        return len(self._ids)
+
+    def apply_changes(self, changes: Dict[int, Optional[object]]):
+        """
+        应用收藏变更
+
+        Args:
+            changes (Dict[int, Optional[sqlite3.Row]]): 收藏ID -> 当前记录（已删除为None）
+        """
+        for item_id, row in changes.items():
+            if row is None:
+                self._deleted.add(item_id)
+                self._remove(item_id)
+            else:
+                self._upsert(item_id, Song.from_row(row))
+        if not self._ids and self._exhausted:
+            self._set_placeholder("暂无收藏的歌单")
+
+    def shutdown(self):
+        """停止加载线程"""
+        self._cancel_threads()
+        for thread in self._threads:
+            thread.wait()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        if self._ids:
+            return len(self._ids)
+        return 1 if self._placeholder else 0
+
+    def flags(self, index):
+        if not self._ids:
+            return QtCore.Qt.ItemIsEnabled
+        return super().flags(index)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if not self._ids:
+            return self._placeholder if role == QtCore.Qt.DisplayRole else None
+        if role == QtCore.Qt.DisplayRole:
+            song = self.record(index.row())
+            return f"{song.title} - {song.author}" if song else ""
+        if role == QtCore.Qt.UserRole:
+            return self.record(index.row())
+        return None
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        return not parent.isValid() and not self._exhausted and self._loading is None
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        after_id = self._ids[-1] if self._ids else 0
+        generation = self._generation
+        thread = LoadingPlaylistThread(self.db_path, after_id, self.page_size, max_rows=self.page_size)
+        thread.chunk_loaded.connect(lambda data, g=generation: self._on_chunk(g, data))
+        thread.load_finished.connect(lambda total, g=generation: self._on_loaded(g, total))
+        thread.finished.connect(lambda t=thread: self._on_thread_finished(t))
+        self._threads.append(thread)
+        self._loading = thread
+        thread.start()
+
+    def _on_chunk(self, generation, data):
+        if generation != self._generation:
+            return
+        last_id = self._ids[-1] if self._ids else 0
+        # 跳过已删除的，以及已通过变更追加过的
+        records = [(item_id, song) for item_id, song in data if item_id > last_id and item_id not in self._deleted]
+        if not records:
+            return
+        self._clear_placeholder()
+        first = len(self._ids)
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(records) - 1)
+        for item_id, song in records:
+            self._ids.append(item_id)
+            self._remember(item_id, self._pending.pop(item_id, song))
+        self.endInsertRows()
+
+    def _on_loaded(self, generation, total):
+        if generation != self._generation:
+            return
+        self._loading = None
+        if total < 0:
+            self._exhausted = True
+            self._clear_placeholder()
+            self.load_failed.emit()
+            return
+        if total < self.page_size:
+            self._exhausted = True
+            # 加载期间新增、但分页查询没有读到的收藏
+            for item_id in sorted(self._pending):
+                self._upsert(item_id, self._pending.pop(item_id))
+            if not self._ids:
+                self._set_placeholder("暂无收藏的歌单")
+            self.logger.info(f"歌单加载完成，共 {len(self._ids)} 条记录")
+
+    def _on_thread_finished(self, thread):
+        """加载线程结束后释放引用"""
+        if thread in self._threads:
+            self._threads.remove(thread)
+        thread.deleteLater()
+
+    def _cancel_threads(self):
+        for thread in self._threads:
+            thread.cancel()
+
+    def _remember(self, item_id: int, song: Song):
+        """写入记录缓存，超出容量时淘汰最久未显示的记录"""
+        self._records[item_id] = song
+        self._records.move_to_end(item_id)
+        while len(self._records) > self.max_records:
+            self._records.popitem(last=False)
+
+    def _refill(self, row: int) -> Optional[Song]:
+        """按 ID 范围重新读取 row 附近一页的记录"""
+        start = max(0, row - self.page_size // 2)
+        end = min(len(self._ids), start + self.page_size) - 1
+        try:
+            records = fetch_favorites_between(self.db_path, self._ids[start], self._ids[end])
+        except Exception as e:
+            self.logger.error(f"读取收藏记录失败: {e}")
+            return None
+        for item_id, song in records:
+            self._remember(item_id, song)
+        return self._records.get(self._ids[row])
+
+    def _find(self, item_id: int) -> int:
+        """收藏ID所在的行，不存在时返回-1"""
+        row = bisect_left(self._ids, item_id)
+        if row < len(self._ids) and self._ids[row] == item_id:
+            return row
+        return -1
+
+    def _upsert(self, item_id: int, song: Song):
+        row = self._find(item_id)
+        if row >= 0:
+            self._remember(item_id, song)
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+            return
+        if not self._exhausted and (not self._ids or item_id > self._ids[-1]):
+            # 还没加载到这里，等分页读到它或全部加载完成后再处理
+            self._pending[item_id] = song
+            return
+        self._clear_placeholder()
+        row = bisect_left(self._ids, item_id)
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self._ids.insert(row, item_id)
+        self._remember(item_id, song)
+        self.endInsertRows()
+
+    def _remove(self, item_id: int):
+        self._records.pop(item_id, None)
+        self._pending.pop(item_id, None)
+        row = self._find(item_id)
+        if row < 0:
+            return
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        del self._ids[row]
+        self.endRemoveRows()
+
+    def _set_placeholder(self, text: str):
+        if self._placeholder == text:
+            return
+        self._clear_placeholder()
+        self.beginInsertRows(QtCore.QModelIndex(), 0, 0)
+        self._placeholder = text
+        self.endInsertRows()
+
+    def _clear_placeholder(self):
+        if self._placeholder is None:
+            return
+        if self._ids:
+            self._placeholder = None
+            return
+        self.beginRemoveRows(QtCore.QModelIndex(), 0, 0)
+        self._placeholder = None
+        self.endRemoveRows()
@@ -5,49 +5,41 @@
 @Date: 2026-01-18
 @File: free_music.py
 """
-import re
 import sys
 import os
 
-import requests
-from PyQt5.QtCore import QThread, pyqtSignal
 from PyQt5.QtMultimedia import QMediaPlayer
 from PyQt5.QtWidgets import QApplication, QWidget, QMessageBox
 
-from PyQt5 import QtCore, QtGui, QtWidgets
-
+from PyQt5 import QtCore, QtWidgets
+
+import http_client
+from audio_cache import AudioCache
+from audio_download import AudioDownloadThread
+from blob_store import deduplicate, link_file
+from cover_cache import CoverCache
+from cover_pool import CoverDownloadPool
+from download_manager import (DownloadManager, STATUS_DONE, STATUS_FAILED, STATUS_PAUSED,
+                              STATUS_QUEUED, STATUS_RUNNING)
+from favorites_model import FavoritesModel
 from freemain import Ui_Dialog
-from get_music import get_music
-from loading_thread import LoadingPlaylistThread
+from library import (collect_changes, iter_favorites, latest_change_id, local_track_hash, local_track_info,
+                     prune_changes, record_local_track, search_library)
+from migrations import migrate
 from music_player import MusicPlayer
-from mysqlite import SQLiteManager
-from utils import download_image, is_binary_file
+from play_queue import MODE_NAMES, MODES
+from progress_tracker import ProgressTracker
+from mysqlite import SQLiteManager, connection_pool
+from search_cache import SearchCache
+from search_thread import SearchPrefetchThread, SearchThread
+from song import Song
+from stream_proxy import StreamingProxy
+from song_table import ActionDelegate, COLUMN_ACTION, COLUMN_COVER, CoverDelegate, SongTableModel
+from thumb_cache import ThumbnailCache
+from track_prefetcher import TrackPrefetcher
 from log_handle import app_logger  # 导入日志配置
 
 
-class ImageDownloadThread(QThread):
-    """
-    图片下载线程
-    """
-    download_finished = pyqtSignal(int, str)  # 发射信号，包含行号和图片路径
-
-    def __init__(self, url, row, parent=None):
-        super().__init__(parent)
-        self.url = url
-        self.row = row
-        self.logger = app_logger  # 使用全局logger
-
-    def run(self):
-        try:
-            image_name = re.findall(r"==/(.*?\.jpg)\?", self.url, re.ASCII)[0]
-            temp_path = os.path.join('./image', image_name)
-            download_image(self.url, temp_path)
-            self.download_finished.emit(self.row, temp_path)
-            self.logger.info(f"图片下载成功: {temp_path}")
-        except Exception as e:
-            self.logger.error(f"下载图片失败: {e}, URL: {self.url}")
-
-
 class MainWindow(QWidget):
     def __init__(self):
         super().__init__()
@@ -61,33 +53,65 @@ class MainWindow(QWidget):
         self.setWindowTitle("Free Music Player")
 
         # 初始化音乐播放器
-        self.music_player = MusicPlayer()
+        self.music_player = MusicPlayer(self)
+        self.music_player.resolver = self.resolve_media
+        self.music_player.track_changed.connect(self.on_track_changed)
+        # 边下边播代理
+        self.stream_proxy = StreamingProxy(parent=self)
+        self.stream_proxy.stream_finished.connect(self.on_stream_finished)
+        self.stream_proxy.stream_failed.connect(self.on_stream_failed)
+        self.stream_proxy.stream_cancelled.connect(self.on_stream_cancelled)
         self.current_play_row = None
-        # 收藏歌单
-        self.collect_list = []
+        # 已处理到的收藏变更ID
+        self.collect_change_id = 0
         self.current_song_list = []
 
         self.page = 1
+        # 搜索请求序号，只有最新一次请求的结果会被显示
+        self.search_request_id = 0
+        self.search_song_name = ""
+        self.search_threads = []
+        # 本次搜索命中的本地曲库歌曲
+        self.local_hits = []
+        # 正在边下边播的歌曲：缓存路径 -> 歌曲信息
+        self.streaming_songs = {}
+        # 双击收藏时加入播放队列的收藏数
+        self.favorites_queue_size = 100
+        # 播放队列中提前缓存的后续歌曲数（0 表示关闭）
+        self.lookahead_tracks = 2
+        # 后台预取后续页数（0 表示关闭预取）
+        self.prefetch_depth = 1
+        self.prefetch_threads = []
         self.image_dir = "./image"
         self.music_dir = "./songs"
         self.cache_dir = "./temp"
 
         self.init_mkdir()
+        # 封面磁盘缓存（跨会话保留）和下载线程池
+        self.cover_cache = CoverCache(self.image_dir)
+        self.cover_pool = CoverDownloadPool(self.cover_cache, max_workers=4, parent=self)
+        self.cover_pool.download_finished.connect(self.on_image_downloaded)
+        # 已缩放的封面缩略图缓存
+        self.thumb_cache = ThumbnailCache(os.path.join(self.image_dir, "thumbs"))
         self.db_path = "./music.db"
-        sqlite_manager = SQLiteManager(self.db_path)
-        sqlite_manager.create_table('tb_collect_playlist',
-                                    "id INTEGER PRIMARY KEY AUTOINCREMENT, "
-                                    "title VARCHAR(255), "
-                                    "author VARCHAR(255), "
-                                    "pic VARCHAR(255), "
-                                    "wording VARCHAR(255), "
-                                    "musicing VARCHAR(255), "
-                                    "play_url VARCHAR(255), "
-                                    "create_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP, "
-                                    "active BOOLEAN DEFAULT 1"
-                                    )
+        # 创建或升级数据库表结构
+        migrate(self.db_path)
+        # 播放过的歌曲的音频缓存，超出容量时按播放记录淘汰（收藏的歌曲保留）
+        self.audio_cache = AudioCache(self.cache_dir, self.db_path, max_bytes=1024 * 1024 * 1024)
+        # 搜索结果缓存，翻页回看时无需再次请求网络
+        self.search_cache = SearchCache(self.db_path)
+        # 后台下载管理器
+        self.download_manager = DownloadManager(self.db_path, max_workers=2, parent=self)
+        self.download_manager.job_progress.connect(self.on_download_progress)
+        self.download_manager.job_status_changed.connect(self.on_download_status_changed)
+        # 播放队列预缓存，带宽预算 512KB/s
+        self.track_prefetcher = TrackPrefetcher(bandwidth=512 * 1024, parent=self)
+        self.track_prefetcher.track_cached.connect(self.on_track_cached)
+        self.setup_song_table()
+        self.setup_favorites_list()
         self.band_event()
         self.setup_player_controls()
+        self.setup_download_controls()
         self.load_collect_playlist()
         self.logger.info("MainWindow初始化完成")
 
@@ -99,17 +123,60 @@ class MainWindow(QWidget):
             if not os.path.exists(dir_path):
                 os.makedirs(dir_path)
 
+    def setup_song_table(self):
+        """搜索结果表格使用数据模型和委托绘制，不为每行创建控件"""
+        table = self.ui.tableWidget_2
+        self.song_model = SongTableModel(self.thumb_cache, self)
+        self.song_model.cover_requested.connect(
+            lambda row, url, priority: self.cover_pool.submit(url, row, priority))
+        self.cover_pool.download_failed.connect(self.song_model.cover_failed)
+        table.setModel(self.song_model)
+
+        self.action_delegate = ActionDelegate(table)
+        self.action_delegate.download_clicked.connect(
+            lambda row: self.download_music(self.current_song_list[row]))
+        self.action_delegate.collect_clicked.connect(
+            lambda row: self.collect_playlist(self.current_song_list[row]))
+        table.setItemDelegateForColumn(COLUMN_ACTION, self.action_delegate)
+        table.setItemDelegateForColumn(COLUMN_COVER, CoverDelegate(table))
+
+        # 固定行高，视图无需逐行计算尺寸
+        table.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        table.verticalHeader().setDefaultSectionSize(29)
+        table.setMouseTracking(True)
+
+    def setup_favorites_list(self):
+        """收藏列表使用按需分页加载的数据模型"""
+        self.favorites_model = FavoritesModel(self.db_path, parent=self)
+        self.favorites_model.load_failed.connect(
+            lambda: QMessageBox.warning(self, "错误", "加载收藏的歌单失败"))
+        self.ui.listWidget.setModel(self.favorites_model)
+        self.ui.listWidget.setUniformItemSizes(True)
+
     def band_event(self):
         # 绑定事件
         self.ui.pushButton_5.clicked.connect(self.btn_next_page)
         self.ui.pushButton_6.clicked.connect(self.btn_prev_page)
         self.ui.pushButton_7.clicked.connect(self.search_music)
         self.ui.pushButton_8.clicked.connect(self.clear_table)
+        self.ui.lineEdit_2.returnPressed.connect(self.search_music)
+
+        # 输入时从本地曲库提示歌名（防抖）
+        self.completer_model = QtCore.QStringListModel(self)
+        completer = QtWidgets.QCompleter(self.completer_model, self)
+        completer.setCaseSensitivity(QtCore.Qt.CaseInsensitive)
+        completer.setFilterMode(QtCore.Qt.MatchContains)
+        self.ui.lineEdit_2.setCompleter(completer)
+        self.suggest_timer = QtCore.QTimer(self)
+        self.suggest_timer.setSingleShot(True)
+        self.suggest_timer.setInterval(150)
+        self.suggest_timer.timeout.connect(self.update_suggestions)
+        self.ui.lineEdit_2.textEdited.connect(lambda _: self.suggest_timer.start())
         # 连接表格双击事件
-        self.ui.tableWidget_2.cellDoubleClicked.connect(self.table_double_clicked)
+        self.ui.tableWidget_2.doubleClicked.connect(lambda index: self.table_double_clicked(index.row()))
 
         # 连接列表双击事件
-        self.ui.listWidget.itemDoubleClicked.connect(self.list_double_clicked)
+        self.ui.listWidget.doubleClicked.connect(self.list_double_clicked)
 
     def setup_player_controls(self):
         """设置播放器控制界面"""
@@ -124,6 +191,16 @@ class MainWindow(QWidget):
         self.stop_button = QtWidgets.QPushButton("停止")
         self.stop_button.clicked.connect(self.stop_music)
 
+        # 上一首/下一首
+        self.previous_button = QtWidgets.QPushButton("上一首")
+        self.previous_button.clicked.connect(self.music_player.previous)
+        self.next_button = QtWidgets.QPushButton("下一首")
+        self.next_button.clicked.connect(self.music_player.next)
+
+        # 播放模式，点击切换
+        self.mode_button = QtWidgets.QPushButton(MODE_NAMES[self.music_player.queue.mode])
+        self.mode_button.clicked.connect(self.switch_play_mode)
+
         # 音量控制
         self.volume_slider = QtWidgets.QSlider(QtCore.Qt.Horizontal)
         self.volume_slider.setRange(0, 100)
@@ -140,6 +217,9 @@ class MainWindow(QWidget):
         # 添加到布局
         control_layout.addWidget(self.play_button)
         control_layout.addWidget(self.stop_button)
+        control_layout.addWidget(self.previous_button)
+        control_layout.addWidget(self.next_button)
+        control_layout.addWidget(self.mode_button)
         control_layout.addWidget(QtWidgets.QLabel("音量:"))
         control_layout.addWidget(self.volume_slider)
         control_layout.addWidget(QtWidgets.QLabel("进度:"))
@@ -148,11 +228,46 @@ class MainWindow(QWidget):
         # 将控制布局添加到主布局
         self.ui.verticalLayout.addLayout(control_layout)
 
+        # 进度条由播放器的进度信号驱动
+        self.progress_tracker = ProgressTracker(self.music_player, self.progress_bar, parent=self)
+
+    def setup_download_controls(self):
+        """设置下载队列控制界面"""
+        download_layout = QtWidgets.QHBoxLayout()
+
+        # 下载当前页全部歌曲
+        self.download_page_button = QtWidgets.QPushButton("下载本页")
+        self.download_page_button.clicked.connect(self.download_current_page)
+
+        # 下载全部收藏
+        self.download_collect_button = QtWidgets.QPushButton("下载收藏")
+        self.download_collect_button.clicked.connect(self.download_collect_list)
+
+        # 暂停/继续
+        self.pause_download_button = QtWidgets.QPushButton("暂停下载")
+        self.pause_download_button.clicked.connect(self.toggle_download_pause)
+
+        # 重试失败的任务
+        self.retry_download_button = QtWidgets.QPushButton("重试失败")
+        self.retry_download_button.clicked.connect(self.retry_failed_downloads)
+
+        # 下载状态
+        self.download_status_label = QtWidgets.QLabel()
+
+        download_layout.addWidget(self.download_page_button)
+        download_layout.addWidget(self.download_collect_button)
+        download_layout.addWidget(self.pause_download_button)
+        download_layout.addWidget(self.retry_download_button)
+        download_layout.addWidget(self.download_status_label, 1)
+
+        self.ui.verticalLayout.addLayout(download_layout)
+        self.update_download_status()
+
     def on_progress_press(self):
         """进度条按下事件 - 暂停自动更新"""
         self.logger.info("进度条被按下")
-        # 可以在这里暂停自动进度更新
-        self.is_user_seeking = True
+        # 拖动期间暂停自动进度更新
+        self.progress_tracker.set_seeking(True)
 
     def on_progress_moving(self, value):
         """进度条移动事件 - 显示预览位置"""
@@ -171,80 +286,47 @@ class MainWindow(QWidget):
             self.music_player.set_position(int(actual_position))
             self.logger.info(f"跳转到位置: {int(actual_position)}ms")
 
-        self.is_user_seeking = False
-
-    def play_music(self, row):
-        """播放指定行的音乐"""
-        self.logger.info(f"开始播放音乐: {row[0]} - {row[1]}")
-
-        # 构造本地文件路径
-        filename = f"{row[0]}--{row[1]}.mp3"
-        filepath = os.path.join(self.cache_dir, filename)
-
-        if os.path.exists(filepath):
-            if self.music_player.load_file(filepath):
-                self.music_player.play(filepath)
-                self.play_button.setText("暂停")
-                self.current_play_row = row
-                self.logger.info(f"音乐播放开始: {filepath}")
-
-                # 更新播放状态
-                self.update_play_status()
-            else:
-                self.logger.error(f"无法加载音频文件: {filepath}")
-                QMessageBox.warning(self, "错误", "无法加载音频文件")
+        self.progress_tracker.set_seeking(False)
 
     def toggle_play_pause(self):
-        """切换播放/暂停 - 优先播放当前节点，否则播放收藏夹第一条"""
+        """切换播放/暂停 - 优先继续播放队列，否则以选中的行或收藏夹作为新的队列"""
         if self.music_player.is_playing():
             # 如果正在播放，则暂停
             self.music_player.pause()
             self.play_button.setText("播放")
+        elif self.music_player.player.state() == QMediaPlayer.PausedState:
+            self.music_player.play()
+            self.play_button.setText("暂停")
+        elif self.music_player.index >= 0:
+            # 已停止，从头播放队列中的当前歌曲
+            self.music_player.play_index(self.music_player.index)
         else:
-            # 如果没有正在播放，则尝试播放当前选中的行
-            if self.music_player.player.state() == QMediaPlayer.PausedState:
-                self.music_player.play()
+            current_row = self.ui.tableWidget_2.currentIndex().row()
+            songs = self.favorites_model.records(0, self.favorites_queue_size)
+            if current_row >= 0:
+                self.play_queue(self.current_song_list, current_row)
+            elif songs:
+                self.play_queue(songs, 0)
             else:
-                # 如果没有当前播放项，尝试播放收藏夹第一条
-                if len(self.collect_list):
-                    # 播放收藏夹第一条
-                    self.download_music(self.collect_list[0][1:], type="cache")
-                    self.play_music(self.collect_list[0][1:3])
-                else:
-                    # 如果没有收藏的音乐，尝试播放当前表格的第一行
-                    current_row = self.ui.tableWidget_2.currentRow()
-                    if current_row >= 0:
-                        song_info = self.current_song_list[current_row]
-                        self.download_music(song_info, type="cache")
-                        self.play_music(song_info)
-                    else:
-                        QMessageBox.warning(self, "错误", "没有可播放的音乐")
+                QMessageBox.warning(self, "错误", "没有可播放的音乐")
+
+    def switch_play_mode(self):
+        """切换到下一种播放模式"""
+        mode = MODES[(MODES.index(self.music_player.queue.mode) + 1) % len(MODES)]
+        self.music_player.set_mode(mode)
+        self.mode_button.setText(MODE_NAMES[mode])
+        self.update_lookahead()
 
     def stop_music(self):
         """停止播放"""
         self.music_player.stop()
         self.play_button.setText("播放")
-        self.progress_bar.setValue(0)
+        self.progress_tracker.reset()
 
     def change_volume(self, value):
         """改变音量"""
         self.music_player.set_volume(value)
 
-    def update_play_status(self):
-        """更新播放状态显示"""
-        # 这里可以添加定时器来更新进度条
-        timer = QtCore.QTimer(self)
-        timer.timeout.connect(self.update_progress)
-        timer.start(1000)  # 每秒更新一次
-
-    def update_progress(self):
-        """更新播放进度"""
-        if self.music_player.get_duration() > 0:
-            position = self.music_player.get_position()
-            duration = self.music_player.get_duration()
-            progress = int((position / duration) * 100)
-            self.progress_bar.setValue(progress)
-
     def table_double_clicked(self, row):
         """
         表格双击事件处理
@@ -253,138 +335,287 @@ class MainWindow(QWidget):
         self.logger.info(f"双击表格第 {row} 行")
         # 从内部存储的歌曲信息中获取完整数据
         if 0 <= row < len(self.current_song_list):
-            song_info = self.current_song_list[row]
-            filename = f"{song_info[0]}--{song_info[1]}.mp3"
-            filepath = os.path.join(self.cache_dir, filename)
-            if not os.path.exists(filepath):
-                self.logger.warning(f"收藏的音乐文件不存在: {filepath}")
-                self.download_music(song_info, type="cache")
-            self.play_music(song_info)
+            # 当前结果页作为播放队列，下一首会提前打开
+            self.play_queue(self.current_song_list, row)
 
-    def list_double_clicked(self, item):
+    def list_double_clicked(self, index):
         """
         列表双击事件处理
-        :param item: 被点击的列表项
+        :param index: 被点击的列表项
         """
-        self.logger.info(f"双击列表项: {item.text()}")
+        self.logger.info(f"双击列表项: {index.data()}")
 
-        # 从自定义角色中获取完整的歌曲信息
-        full_data = item.data(QtCore.Qt.UserRole)
-        self.logger.debug(f"获取的完整歌曲信息: {full_data}")
+        # 从自定义角色中获取收藏的歌曲
+        song = index.data(QtCore.Qt.UserRole)
+        self.logger.debug(f"获取的完整歌曲信息: {song}")
 
-        if full_data:
-            # 从存储的数据中获取完整信息
-            title = full_data[1]
-            author = full_data[2]
-            play_url = full_data[6]
+        if song:
+            # 从该收藏开始的一段收藏作为播放队列
+            songs = self.favorites_model.records(index.row(), self.favorites_queue_size)
+            self.play_queue(songs, 0)
 
-            # 构造本地文件路径
-            filename = f"{title}--{author}.mp3"
-            filepath = os.path.join(self.cache_dir, filename)
-            song_info = [title, author, "", "", "", play_url]
+    def play_queue(self, songs, index):
+        """
+        设置播放队列并播放第 index 首
+        :param songs: 歌曲列表
+        :param index: 开始播放的位置
+        """
+        if not self.music_player.set_queue(songs, index):
+            self.logger.error(f"无法播放队列第 {index} 首")
+            QMessageBox.warning(self, "错误", "无法加载音频文件")
 
-            if not os.path.exists(filepath):
-                self.logger.warning(f"收藏的音乐文件不存在: {filepath}")
-                self.download_music(song_info, type="cache")
-            self.play_music(song_info)
+    def resolve_media(self, song):
+        """
+        播放队列的播放地址：已下载或已缓存时直接播放本地文件，否则边下边播
+        :param song: 歌曲信息 Song
+        :return: (边下边播地址或None, 本地文件路径)
+        """
+        filepath = os.path.join(self.music_dir, song.filename)
+        if os.path.exists(filepath):
+            return None, filepath
+        filepath = self.audio_cache.get(song)
+        if filepath is not None:
+            return None, filepath
+
+        filepath = self.audio_cache.path_for(song)
+        self.logger.info(f"音乐未缓存，边下边播: {filepath}")
+        self.streaming_songs[filepath] = song
+        return self.stream_proxy.open(song.play_url, filepath), filepath
+
+    def on_track_changed(self, song):
+        """播放队列切换到新的歌曲"""
+        self.logger.info(f"开始播放音乐: {song.title} - {song.author}")
+        self.play_button.setText("暂停")
+        self.current_play_row = song
+        self.audio_cache.touch(song)
+        self.update_lookahead()
+
+    def update_lookahead(self):
+        """预缓存播放队列中接下来的几首（已缓存和正在边下边播的除外）"""
+        self.release_idle_streams()
+        targets = []
+        for song in self.music_player.upcoming(self.lookahead_tracks):
+            filepath = self.audio_cache.path_for(song)
+            if filepath not in self.streaming_songs:
+                targets.append((song, filepath))
+        self.track_prefetcher.set_upcoming(targets)
+
+    def release_idle_streams(self):
+        """中止既不在播放也没有预加载的边下边播下载，不与当前歌曲争抢带宽"""
+        in_use = {self.music_player.current_file, self.music_player.preloaded_file}
+        for cache_path in list(self.streaming_songs):
+            if cache_path not in in_use:
+                self.stream_proxy.release(cache_path)
+
+    def on_stream_cancelled(self, cache_path):
+        """边下边播下载已中止，仍在播放队列前方时改由预缓存下载"""
+        if self.streaming_songs.pop(cache_path, None) is not None:
+            self.update_lookahead()
+
+    def on_track_cached(self, song, cache_path, info, content_hash):
+        """预缓存完成回调，登记到音频缓存和本地曲库"""
+        self.add_to_cache(song, cache_path, info, content_hash)
+
+    def on_stream_finished(self, cache_path, content_hash):
+        """边下边播缓存完成回调，登记到音频缓存和本地曲库"""
+        song = self.streaming_songs.pop(cache_path, None)
+        if song is not None:
+            self.add_to_cache(song, cache_path, self.stream_proxy.audio_info(cache_path), content_hash)
+
+    def add_to_cache(self, song, cache_path, info, content_hash=''):
+        """
+        登记缓存完成的歌曲，超出缓存容量时淘汰不再需要的文件
+        :param song: 歌曲信息 Song
+        :param cache_path: 缓存文件路径
+        :param info: 下载时识别出的 AudioInfo，未知时为None
+        :param content_hash: 下载时计算的内容哈希，未知时为空
+        """
+        self.register_local_file(song, cache_path, "cache", info, content_hash)
+        self.audio_cache.add(song, info, keep=self.cache_files_in_use())
 
-    def on_image_downloaded(self, row, image_path):
+    def register_local_file(self, song, file_path, kind, info, content_hash=''):
+        """
+        登记到本地曲库；下载目录或缓存目录中已有内容相同的文件时改为硬链接，同样的数据只保存一份
+        :param song: 歌曲信息 Song
+        :param file_path: 本地文件路径
+        :param kind: 'cache' 或 'download'
+        :param info: 下载时识别出的 AudioInfo，未知时为None
+        :param content_hash: 下载线程计算的内容哈希，未知时为空（不合并重复文件）
+        """
+        deduplicate(self.db_path, file_path, content_hash)
+        record_local_track(self.db_path, song, file_path, kind, info, content_hash)
+
+    def link_from_cache(self, song, filepath):
+        """
+        歌曲已缓存时直接链接到下载目录，不再请求网络
+        :param song: 歌曲信息 Song
+        :param filepath: 下载目录中的路径
+        :return: 是否已从缓存得到
+        """
+        cached = self.audio_cache.get(song)
+        if cached is None:
+            return False
+        try:
+            link_file(cached, filepath)
+        except OSError as e:
+            self.logger.error(f"从缓存复制歌曲失败: {e}, 文件: {filepath}")
+            return False
+        self.logger.info(f"歌曲已从缓存得到: {filepath}")
+        self.register_local_file(song, filepath, "download", local_track_info(self.db_path, cached),
+                                 local_track_hash(self.db_path, cached))
+        return True
+
+    def cache_files_in_use(self):
+        """正在播放、预加载、边下边播或即将预缓存的文件，缓存淘汰时跳过"""
+        files = {self.music_player.current_file, self.music_player.preloaded_file}
+        files.update(self.streaming_songs)
+        files.update(self.audio_cache.path_for(song) for song in self.music_player.upcoming(self.lookahead_tracks))
+        return files
+
+    def on_stream_failed(self, cache_path, invalid, message):
+        """边下边播下载失败回调"""
+        self.streaming_songs.pop(cache_path, None)
+        if self.music_player.preloaded_file == cache_path:
+            # 预加载的下一首已无法播放，切歌时重新请求
+            self.music_player.discard_preload()
+        if self.music_player.current_file != cache_path:
+            return
+        self.stop_music()
+        if invalid:
+            QMessageBox.warning(self, "版权保护", "该歌曲因版权问题无法加载")
+        else:
+            QMessageBox.critical(self, "错误", f"缓存音乐请求失败: {message}")
+
+    def on_image_downloaded(self, row, url, image_path):
         """
         图片下载完成回调
         """
         try:
-            import os
-            pixmap = QtGui.QPixmap(image_path)
-            if not pixmap.isNull():
-                image_label = QtWidgets.QLabel()
-                scaled_pixmap = pixmap.scaled(
-                    25, 25,
-                    QtCore.Qt.KeepAspectRatio,
-                    QtCore.Qt.SmoothTransformation
-                )
-                image_label.setPixmap(scaled_pixmap)
-                image_label.setAlignment(QtCore.Qt.AlignCenter)
-                image_label.setMaximumSize(25, 25)
-                self.ui.tableWidget_2.setCellWidget(row, 3, image_label)
+            pixmap = self.thumb_cache.from_image(url, image_path, (25, 25))
+            if pixmap is None:
+                self.song_model.cover_failed(row, url)
+                return
+            self.song_model.cover_ready(row, url)
             self.logger.debug(f"图片显示成功: {image_path}")
         except Exception as e:
             self.logger.error(f"处理下载的图片失败: {e}, Path: {image_path}")
+            self.song_model.cover_failed(row, url)
+
+    def update_suggestions(self):
+        """根据输入内容更新本地曲库的提示"""
+        songs = search_library(self.db_path, self.ui.lineEdit_2.text(), limit=10)
+        self.completer_model.setStringList([f"{song.title} {song.author}" for song in songs])
 
     def search_music(self):
         song_name = self.ui.lineEdit_2.text()
         self.logger.info(f"开始搜索音乐: {song_name}, 页码: {self.page}")
 
-        try:
-            ret, song_info = get_music(song_name, self.page)
-            if ret:
-                # 存储当前歌曲列表，用于双击事件
-                self.current_song_list = song_info
-
-                # 清空现有数据
-                self.ui.tableWidget_2.setRowCount(0)
-
-                # 存储下载线程
-                self.image_threads = []
-
-                for row_index, item in enumerate(song_info):
-                    [title, author, pic, wording, musicing, play_url] = item
-                    title = re.sub(r'[^\w\s\u4e00-\u9fff]', '', title)
-                    author = re.sub(r'[^\w\s\u4e00-\u9fff]', '', author)
-                    item[0] = title
-                    item[1] = author
-
-                    self.ui.tableWidget_2.setRowCount(row_index + 1)
-                    # 逐列设置数据
-                    self.ui.tableWidget_2.setItem(row_index, 1, QtWidgets.QTableWidgetItem(title))
-                    self.ui.tableWidget_2.setItem(row_index, 2, QtWidgets.QTableWidgetItem(author))
-
-                    # 创建占位标签
-                    placeholder_label = QtWidgets.QLabel("加载中...")
-                    placeholder_label.setAlignment(QtCore.Qt.AlignCenter)
-                    placeholder_label.setMaximumSize(25, 25)
-                    self.ui.tableWidget_2.setCellWidget(row_index, 3, placeholder_label)
-
-                    thread = ImageDownloadThread(pic, row_index)
-                    thread.download_finished.connect(self.on_image_downloaded)
-                    self.image_threads.append(thread)
-                    thread.start()
-
-                    self.ui.tableWidget_2.setItem(row_index, 4, QtWidgets.QTableWidgetItem(wording))
-                    self.ui.tableWidget_2.setItem(row_index, 5, QtWidgets.QTableWidgetItem(musicing))
-
-                    # 第1列（操作列）添加图标按钮
-                    btn_widget = QtWidgets.QWidget()
-                    layout = QtWidgets.QHBoxLayout(btn_widget)
-                    layout.setContentsMargins(2, 2, 2, 2)
-                    layout.setSpacing(2)
-
-                    # 下载按钮
-                    download_btn = QtWidgets.QToolButton()
-                    download_btn.setIcon(QtGui.QIcon("./icons/download.png"))
-                    download_btn.setToolTip("下载当前行歌曲")
-                    download_btn.clicked.connect(lambda checked=False, item_copy=item: self.download_music(item_copy))
-
-                    # 收藏按钮
-                    collect_btn = QtWidgets.QToolButton()
-                    collect_btn.setIcon(QtGui.QIcon("./icons/add.png"))
-                    collect_btn.setToolTip("添加到个人收藏夹")
-                    collect_btn.clicked.connect(lambda checked=False, item_copy=item: self.collect_playlist(item_copy))
-
-                    # 添加按钮到布局
-                    layout.addWidget(download_btn)
-                    layout.addWidget(collect_btn)
-                    layout.setAlignment(QtCore.Qt.AlignCenter)
-                    btn_widget.setLayout(layout)
-                    self.ui.tableWidget_2.setCellWidget(row_index, 0, btn_widget)
+        # 新的请求使之前所有未完成的请求失效
+        self.search_request_id += 1
+        self.search_song_name = song_name
+        for thread in self.search_threads:
+            thread.cancel()
+        self.stop_prefetch()
+
+        # 本地曲库的结果立即显示在最前面，网络结果返回后追加在其后
+        self.local_hits = search_library(self.db_path, song_name) if self.page == 1 else []
+        if self.local_hits:
+            self.logger.info(f"本地曲库找到 {len(self.local_hits)} 首歌曲")
+            self.render_song_table(self.local_hits)
+
+        # 内存缓存命中时直接显示，无需启动后台线程
+        song_info = self.search_cache.peek(song_name, self.page)
+        if song_info is not None:
+            self.show_search_result(song_name, True, song_info)
+            return
+
+        thread = SearchThread(self.search_request_id, song_name, self.page, self.search_cache)
+        thread.search_finished.connect(self.on_search_finished)
+        thread.finished.connect(lambda t=thread: self.on_search_thread_finished(t))
+        self.search_threads.append(thread)
+        thread.start()
+
+    def on_search_thread_finished(self, thread):
+        """搜索线程结束后释放引用"""
+        if thread in self.search_threads:
+            self.search_threads.remove(thread)
+        thread.deleteLater()
+
+    def on_search_finished(self, request_id, ret, song_info):
+        """
+        搜索完成回调，丢弃过期请求的结果
+        """
+        if request_id != self.search_request_id:
+            self.logger.debug(f"忽略过期的搜索结果, 请求序号: {request_id}")
+            return
+        self.show_search_result(self.search_song_name, ret, song_info)
 
+    def show_search_result(self, song_name, ret, song_info):
+        """
+        将搜索结果（本地曲库结果在前）显示到表格中
+        """
+        if ret:
+            # 本地记录保存的是去掉特殊字符后的歌名歌手，网络结果需同样处理后再比较
+            local_keys = {song.sanitized().key for song in self.local_hits}
+            song_info = self.local_hits + [song for song in song_info if song.sanitized().key not in local_keys]
+            if self.render_song_table(song_info):
                 self.logger.info(f"搜索完成，找到 {len(song_info)} 首歌曲")
-            else:
-                self.logger.warning(f"未找到歌曲: {song_name}")
-                QMessageBox.warning(self, "提示", "没有找到歌曲")
+                self.start_prefetch(song_name, self.page)
+        elif self.local_hits:
+            self.logger.warning(f"网络搜索失败，仅显示本地结果: {song_name}")
+        else:
+            self.logger.warning(f"未找到歌曲: {song_name}")
+            QMessageBox.warning(self, "提示", "没有找到歌曲")
+
+    def render_song_table(self, song_info):
+        """
+        将歌曲列表显示到表格中
+        :param song_info: 歌曲列表 [Song, ...]
+        :return: 是否显示成功
+        """
+        try:
+            # 存储当前歌曲列表，用于双击事件
+            self.current_song_list = [song.sanitized() for song in song_info]
+
+            # 取消上一页未完成的封面下载，封面在行第一次显示时才排队下载
+            self.cover_pool.cancel_all()
+
+            self.song_model.set_songs(self.current_song_list)
+            self.ui.tableWidget_2.scrollToTop()
+
+            return True
 
         except Exception as e:
             self.logger.error(f"搜索音乐时发生错误: {e}")
             QMessageBox.critical(self, "错误", f"搜索音乐时发生错误: {e}")
+            return False
+
+    def start_prefetch(self, song_name, page):
+        """
+        在后台预取后续页的搜索结果和封面
+        :param song_name: 搜索关键字
+        :param page: 当前页码
+        """
+        self.stop_prefetch()
+        depth = max(0, min(self.prefetch_depth, SearchPrefetchThread.MAX_DEPTH))
+        if not depth:
+            return
+        pages = list(range(page + 1, page + 1 + depth))
+        thread = SearchPrefetchThread(song_name, pages, self.search_cache, self.cover_cache)
+        thread.finished.connect(lambda t=thread: self.on_prefetch_thread_finished(t))
+        self.prefetch_threads.append(thread)
+        thread.start()
+
+    def stop_prefetch(self):
+        """取消正在进行的预取"""
+        for thread in self.prefetch_threads:
+            thread.cancel()
+
+    def on_prefetch_thread_finished(self, thread):
+        """预取线程结束后释放引用"""
+        if thread in self.prefetch_threads:
+            self.prefetch_threads.remove(thread)
+        thread.deleteLater()
 
     def btn_next_page(self):
         self.page += 1
@@ -406,154 +637,246 @@ class MainWindow(QWidget):
 
         return handler
 
-    def download_music(self, row, type="download"):
+    def download_music(self, song, type="download"):
         if type == "download":
-            self.logger.info(f"开始下载音乐: {row[0]} - {row[1]}")
+            self.logger.info(f"开始下载音乐: {song.title} - {song.author}")
             msg = QMessageBox.information(
                 self,
                 "提示",
-                f"确定下载{row[0]}---{row[1]}吗？",
+                f"确定下载{song.title}---{song.author}吗？",
                 QMessageBox.Yes | QMessageBox.No
             )
 
             if msg == QMessageBox.Yes:
-                self.save_music(row, type)
+                self.enqueue_download(song)
         else:
-            self.save_music(row, type)
+            self.save_music(song, type)
 
-    def save_music(self, row, type="download"):
+    def enqueue_download(self, song):
+        """
+        将歌曲加入后台下载队列
+        :param song: 歌曲信息 Song
+        :return: 任务ID，文件已存在时返回None
+        """
+        filepath = os.path.join(self.music_dir, song.filename)
+        if os.path.exists(filepath):
+            self.logger.info(f"歌曲已下载: {filepath}")
+            return None
+        if self.link_from_cache(song, filepath):
+            return None
+        return self.download_manager.enqueue(song.play_url, filepath, song.title, song.author)
+
+    def download_current_page(self):
+        """下载当前页的全部歌曲"""
+        for song in self.current_song_list:
+            self.enqueue_download(song)
+        self.update_download_status()
+
+    def download_collect_list(self):
+        """下载收藏夹中的全部歌曲"""
+        for song in iter_favorites(self.db_path):
+            self.enqueue_download(song)
+        self.update_download_status()
+
+    def toggle_download_pause(self):
+        """暂停或继续全部下载任务"""
+        manager = self.download_manager
+        paused = manager.job_ids(STATUS_PAUSED)
+        if paused and not manager.job_ids(STATUS_QUEUED, STATUS_RUNNING):
+            for job_id in paused:
+                manager.resume(job_id)
+        else:
+            for job_id in manager.job_ids(STATUS_QUEUED, STATUS_RUNNING):
+                manager.pause(job_id)
+        self.update_download_status()
+
+    def retry_failed_downloads(self):
+        """重试全部失败的下载任务"""
+        for job_id in self.download_manager.job_ids(STATUS_FAILED):
+            self.download_manager.retry(job_id)
+
+    def on_download_progress(self, job_id, downloaded, total, speed, eta):
+        """下载进度回调"""
+        job = self.download_manager.get_job(job_id)
+        if job is None:
+            return
+        percent = f"{downloaded * 100 // total}%" if total else f"{downloaded // 1024}KB"
+        eta_str = f", 剩余 {int(eta)} 秒" if eta >= 0 else ""
+        self.download_status_label.setText(
+            f"{self.download_summary()} | {job['title']} {percent}, {speed / 1024:.0f}KB/s{eta_str}")
+
+    def on_download_status_changed(self, job_id, status, message):
+        """下载任务状态变化回调"""
+        if status == STATUS_FAILED:
+            self.logger.warning(f"下载任务失败, ID: {job_id}, {message}")
+        elif status == STATUS_DONE:
+            job = self.download_manager.get_job(job_id)
+            if job is not None:
+                song = Song.create(job['title'], job['author'], play_url=job['url'])
+                info = self.download_manager.pop_audio_info(job_id)
+                content_hash = self.download_manager.pop_content_hash(job_id)
+                self.register_local_file(song, job['dest_path'], "download", info, content_hash)
+        self.update_download_status()
+
+    def download_summary(self):
+        """下载队列概况"""
+        counts = self.download_manager.counts()
+        return (f"下载中 {counts.get(STATUS_RUNNING, 0)}, 排队 {counts.get(STATUS_QUEUED, 0)}, "
+                f"暂停 {counts.get(STATUS_PAUSED, 0)}, 失败 {counts.get(STATUS_FAILED, 0)}, "
+                f"完成 {counts.get(STATUS_DONE, 0)}")
+
+    def update_download_status(self):
+        """刷新下载状态显示"""
+        counts = self.download_manager.counts()
+        has_paused = counts.get(STATUS_PAUSED, 0) and not (counts.get(STATUS_QUEUED, 0) or counts.get(STATUS_RUNNING, 0))
+        self.pause_download_button.setText("继续下载" if has_paused else "暂停下载")
+        self.download_status_label.setText(self.download_summary())
+
+    def save_music(self, song, type="download"):
         action_str = "下载" if type == "download" else "缓存"
         save_path = self.music_dir if type == "download" else self.cache_dir
-        filename = f"{row[0]}--{row[1]}.mp3"
-        filepath = os.path.join(save_path, filename)
-        if os.path.exists(filepath):
-            return True
-        try:
-            response = requests.get(row[5], timeout=30)
-            response.raise_for_status()  # 检查HTTP错误
-
-            music_content = response.content
-
-            if not os.path.exists(save_path):
-                os.makedirs(save_path)
-
-            with open(filepath, 'wb') as f:
-                f.write(music_content)
-
-            # 检查下载的文件是否为有效的二进制音频文件
-            if not is_binary_file(filepath):
-                # 删除无效文件
-                os.remove(filepath)
-                self.logger.warning(f"下载的文件不是有效的音频文件，已删除: {filepath}")
-                QMessageBox.warning(self, "版权保护", f"歌曲 '{row[0]} - {row[1]}' 因版权问题无法加载")
-                return False
-
-            self.logger.info(f"音乐{action_str}成功: {filepath}")
-            QMessageBox.information(self, "提示", f"{action_str}成功, 已保存至{save_path}目录下")
-            return True
-
-        except requests.RequestException as e:
-            self.logger.error(f"{action_str}音乐请求失败: {e}")
-            QMessageBox.critical(self, "错误", f"{action_str}音乐请求失败: {e}")
+        if type == "download":
+            filepath = os.path.join(save_path, song.filename)
+            if os.path.exists(filepath) or self.link_from_cache(song, filepath):
+                return True
+        else:
+            if self.audio_cache.get(song) is not None:
+                return True
+            filepath = self.audio_cache.path_for(song)
+
+        # 在后台线程流式下载，等待期间界面保持响应
+        progress_dialog = QtWidgets.QProgressDialog(f"正在{action_str} {song.title} - {song.author}", "取消", 0, 0, self)
+        progress_dialog.setWindowTitle("提示")
+        progress_dialog.setWindowModality(QtCore.Qt.WindowModal)
+        progress_dialog.setMinimumDuration(500)
+
+        thread = AudioDownloadThread(song.play_url, filepath)
+        loop = QtCore.QEventLoop()
+        result = {}
+
+        def on_progress(downloaded, total):
+            if total > 0:
+                progress_dialog.setMaximum(total)
+                progress_dialog.setValue(downloaded)
+
+        def on_finished(code, message):
+            result['code'] = code
+            result['message'] = message
+
+        thread.progress.connect(on_progress)
+        thread.download_finished.connect(on_finished)
+        thread.finished.connect(loop.quit)
+        progress_dialog.canceled.connect(thread.cancel)
+        thread.start()
+        loop.exec_()
+        thread.wait()
+        progress_dialog.close()
+
+        code = result.get('code', AudioDownloadThread.RESULT_ERROR)
+        if code == AudioDownloadThread.RESULT_INVALID:
+            self.logger.warning(f"下载的文件不是有效的音频文件，已放弃: {filepath}")
+            QMessageBox.warning(self, "版权保护", f"歌曲 '{song.title} - {song.author}' 因版权问题无法加载")
             return False
-        except Exception as e:
-            self.logger.error(f"{action_str}音乐时发生错误: {e}")
-            QMessageBox.critical(self, "错误", f"{action_str}音乐时发生错误: {e}")
+        if code != AudioDownloadThread.RESULT_OK:
+            message = result.get('message', '')
+            self.logger.error(f"{action_str}音乐时发生错误: {message}")
+            QMessageBox.critical(self, "错误", f"{action_str}音乐请求失败: {message}")
             return False
 
+        self.logger.info(f"音乐{action_str}成功: {filepath}")
+        if type == "download":
+            self.register_local_file(song, filepath, type, thread.audio_info, thread.content_hash)
+        else:
+            self.add_to_cache(song, filepath, thread.audio_info, thread.content_hash)
+        QMessageBox.information(self, "提示", f"{action_str}成功, 已保存至{save_path}目录下")
+        return True
+
     def clear_table(self):
         # 清空现有数据
-        self.ui.tableWidget_2.setRowCount(0)
+        self.current_song_list = []
+        self.song_model.clear()
         self.logger.debug("表格已清空")
 
-    def collect_playlist(self, row):
+    def collect_playlist(self, song):
         """
         收藏歌单
-        :param row: 歌曲信息 [title, author, pic, wording, musicing, play_url]
+        :param song: 歌曲信息 Song
         """
-        self.logger.info(f"开始收藏歌单: {row[0]} - {row[1]}")
+        self.logger.info(f"开始收藏歌单: {song.title} - {song.author}")
 
         try:
             sqlite_manager = SQLiteManager(self.db_path)
 
-            [title, author, pic, wording, musicing, play_url] = row
-            data = {
-                'title': title,
-                'author': author,
-                'pic': pic,
-                'wording': wording,
-                'musicing': musicing,
-                'play_url': play_url
-            }
-            ret = self.save_music(row, type="cache")
+            if sqlite_manager.select_one('tb_collect_playlist', "song_key = ?", (song.key,)) is not None:
+                self.logger.info(f"歌曲已在收藏夹中: {song.title} - {song.author}")
+                QMessageBox.information(self, "提示", "歌曲已在收藏夹中")
+                return
+
+            ret = self.save_music(song, type="cache")
             if ret:
-                result = sqlite_manager.insert_one('tb_collect_playlist', data)
+                result = sqlite_manager.insert_one('tb_collect_playlist', song.to_db_dict())
                 self.logger.info(f"歌单收藏成功，ID: {result}")
                 QMessageBox.information(self, "提示", "歌单收藏成功")
 
-            # 立即刷新收藏列表
-            self.load_collect_playlist()
+            # 只把新增的收藏追加到列表中
+            self.refresh_collect_playlist()
 
         except Exception as e:
             self.logger.error(f"收藏歌单时发生错误: {e}")
             QMessageBox.critical(self, "错误", f"收藏歌单时发生错误: {e}")
 
     def load_collect_playlist(self):
-        """加载收藏的歌单，带加载效果"""
+        """重新加载收藏的歌单，列表滚动到末尾时按页加载后续数据"""
         self.logger.info("开始加载收藏的歌单")
 
-        # 显示加载提示
-        self.ui.listWidget.clear()
-        loading_item = QtWidgets.QListWidgetItem("加载中...")
-        loading_item.setFlags(QtCore.Qt.ItemIsEnabled)
-        self.ui.listWidget.addItem(loading_item)
-
-        # 在后台线程加载数据
-        self.loading_thread = LoadingPlaylistThread(self.db_path)
-        self.loading_thread.data_loaded.connect(self.on_playlist_loaded)
-        self.loading_thread.start()
-
-    def on_playlist_loaded(self, data):
-        """处理加载完成的数据"""
-        self.ui.listWidget.clear()
-
-        if not data:
-            # 如果没有数据，显示提示
-            no_data_item = QtWidgets.QListWidgetItem("暂无收藏的歌单")
-            no_data_item.setFlags(QtCore.Qt.ItemIsEnabled)
-            self.ui.listWidget.addItem(no_data_item)
-        else:
-            for item in data:
-                list_item = QtWidgets.QListWidgetItem(f"{item['title']} - {item['author']}")
-                # 将完整的信息存储到Qt.UserRole中
-                list_item.setData(QtCore.Qt.UserRole, item)
-                self.collect_list.append(item)
-                self.ui.listWidget.addItem(list_item)
+        # 先记下变更位置，加载期间发生的变更随后增量应用
+        self.collect_change_id = latest_change_id(self.db_path)
+        prune_changes(self.db_path, self.collect_change_id)
+        self.favorites_model.reload()
 
-        self.logger.info(f"歌单加载完成，共 {len(data)} 条记录")
+    def refresh_collect_playlist(self):
+        """按变更日志增量刷新收藏列表，只处理上次刷新之后的变更"""
+        try:
+            self.collect_change_id, changes = collect_changes(self.db_path, self.collect_change_id)
+        except Exception as e:
+            self.logger.error(f"读取收藏变更失败: {e}")
+            self.load_collect_playlist()
+            return
+        if changes:
+            self.favorites_model.apply_changes(changes)
+            self.logger.debug(f"收藏列表增量刷新 {len(changes)} 条")
 
     def closeEvent(self, event):
         """
-        重写关闭事件，清理临时目录
+        重写关闭事件，停止后台任务并保存缓存索引
         """
         self.logger.info("应用程序即将关闭")
 
-        # 停止所有正在运行的下载线程
-        if hasattr(self, 'image_threads'):
-            for thread in self.image_threads:
-                if thread.isRunning():
-                    thread.quit()
-                    thread.wait()
-            self.logger.debug("所有图片下载线程已停止")
-
-        # 删除临时目录
-        if os.path.exists(self.image_dir):
-            try:
-                import shutil
-                shutil.rmtree(self.image_dir)
-                self.logger.info(f"已删除临时目录: {self.image_dir}")
-            except Exception as e:
-                self.logger.error(f"删除临时目录失败: {e}")
+        # 停止封面下载线程池
+        self.cover_pool.shutdown()
+
+        # 停止下载管理器，未完成的任务下次启动时续传
+        self.download_manager.shutdown()
+        self.track_prefetcher.shutdown()
+
+        # 等待未完成的搜索、预取和加载线程结束
+        for thread in self.search_threads:
+            thread.cancel()
+            thread.wait()
+        for thread in self.prefetch_threads:
+            thread.cancel()
+            thread.wait()
+        self.favorites_model.shutdown()
+
+        # 保存封面缓存索引
+        self.cover_cache.close()
+
+        # 停止边下边播代理
+        self.stream_proxy.shutdown()
+
+        # 关闭HTTP连接池和数据库连接池
+        http_client.close()
+        connection_pool.close_all()
 
         # 调用父类的关闭事件处理
         super().closeEvent(event)
@@ -37,49 +37,13 @@ class Ui_Dialog(object):
         self.pushButton_6 = QtWidgets.QPushButton(Dialog)
         self.pushButton_6.setObjectName("pushButton_6")
         self.gridLayout_2.addWidget(self.pushButton_6, 2, 0, 1, 1)
-        self.tableWidget_2 = QtWidgets.QTableWidget(Dialog)
+        self.tableWidget_2 = QtWidgets.QTableView(Dialog)
         self.tableWidget_2.setMinimumSize(QtCore.QSize(407, 0))
         self.tableWidget_2.setMaximumSize(QtCore.QSize(800, 16777215))
+        self.tableWidget_2.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.tableWidget_2.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollPerPixel)
         self.tableWidget_2.setGridStyle(QtCore.Qt.DotLine)
-        self.tableWidget_2.setRowCount(10)
         self.tableWidget_2.setObjectName("tableWidget_2")
-        self.tableWidget_2.setColumnCount(6)
-        item = QtWidgets.QTableWidgetItem()
-        font = QtGui.QFont()
-        font.setBold(True)
-        font.setWeight(75)
-        item.setFont(font)
-        self.tableWidget_2.setHorizontalHeaderItem(0, item)
-        item = QtWidgets.QTableWidgetItem()
-        font = QtGui.QFont()
-        font.setBold(True)
-        font.setWeight(75)
-        item.setFont(font)
-        self.tableWidget_2.setHorizontalHeaderItem(1, item)
-        item = QtWidgets.QTableWidgetItem()
-        font = QtGui.QFont()
-        font.setBold(True)
-        font.setWeight(75)
-        item.setFont(font)
-        self.tableWidget_2.setHorizontalHeaderItem(2, item)
-        item = QtWidgets.QTableWidgetItem()
-        font = QtGui.QFont()
-        font.setBold(True)
-        font.setWeight(75)
-        item.setFont(font)
-        self.tableWidget_2.setHorizontalHeaderItem(3, item)
-        item = QtWidgets.QTableWidgetItem()
-        font = QtGui.QFont()
-        font.setBold(True)
-        font.setWeight(75)
-        item.setFont(font)
-        self.tableWidget_2.setHorizontalHeaderItem(4, item)
-        item = QtWidgets.QTableWidgetItem()
-        font = QtGui.QFont()
-        font.setBold(True)
-        font.setWeight(75)
-        item.setFont(font)
-        self.tableWidget_2.setHorizontalHeaderItem(5, item)
         self.gridLayout_2.addWidget(self.tableWidget_2, 1, 0, 1, 5)
         self.pushButton_7 = QtWidgets.QPushButton(Dialog)
         font = QtGui.QFont()
@@ -95,7 +59,7 @@ class Ui_Dialog(object):
         self.gridLayout_2.addWidget(self.pushButton_8, 2, 4, 1, 1)
         spacerItem = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
         self.gridLayout_2.addItem(spacerItem, 2, 2, 1, 2)
-        self.listWidget = QtWidgets.QListWidget(Dialog)
+        self.listWidget = QtWidgets.QListView(Dialog)
         self.listWidget.setObjectName("listWidget")
         self.gridLayout_2.addWidget(self.listWidget, 1, 5, 2, 1)
         self.gridLayout_2.setColumnMinimumWidth(0, 1)
@@ -121,17 +85,5 @@ class Ui_Dialog(object):
         Dialog.setWindowTitle(_translate("Dialog", "Dialog"))
         self.pushButton_5.setText(_translate("Dialog", "下一页"))
         self.pushButton_6.setText(_translate("Dialog", "上一页"))
-        item = self.tableWidget_2.horizontalHeaderItem(0)
-        item.setText(_translate("Dialog", "操作"))
-        item = self.tableWidget_2.horizontalHeaderItem(1)
-        item.setText(_translate("Dialog", "歌名"))
-        item = self.tableWidget_2.horizontalHeaderItem(2)
-        item.setText(_translate("Dialog", "歌手"))
-        item = self.tableWidget_2.horizontalHeaderItem(3)
-        item.setText(_translate("Dialog", "专辑"))
-        item = self.tableWidget_2.horizontalHeaderItem(4)
-        item.setText(_translate("Dialog", "作词"))
-        item = self.tableWidget_2.horizontalHeaderItem(5)
-        item.setText(_translate("Dialog", "作曲"))
         self.pushButton_7.setText(_translate("Dialog", "搜索"))
         self.pushButton_8.setText(_translate("Dialog", "清空"))
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Author: unknown
+@Date: 2026-01-18
+@File: http_bench.py
+"""
+
+import gzip
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+import http_client
+
+
+class _LocalHandler(BaseHTTPRequestHandler):
+    """本地测试服务器的请求处理：返回固定内容，支持 keep-alive 和 gzip"""
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True  # 头部和正文分开写出，keep-alive 连接下避免 Nagle 延迟
+    payload = b''
+
+    def do_GET(self):
+        body = self.payload
+        self.send_response(200)
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_POST = do_GET
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalTestServer:
+    """
+    本地替身服务器，用于离线测试和性能对比
+
+    用法:
+        with LocalTestServer(payload=b'...') as server:
+            http_client.get(server.url)
+    """
+
+    def __init__(self, payload: bytes = b'x' * 1024, host: str = '127.0.0.1', port: int = 0):
+        handler = type('Handler', (_LocalHandler,), {'payload': payload})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def benchmark(fetch, url: str, requests_count: int = 200, workers: int = 4) -> float:
+    """
+    并发请求 url，返回每秒完成的请求数
+
+    Args:
+        fetch: 发起请求的函数，参数为 url
+        url (str): 请求地址
+        requests_count (int): 请求总数
+        workers (int): 并发线程数
+
+    Returns:
+        float: 吞吐量（请求/秒）
+    """
+    def task(_):
+        response = fetch(url)
+        response.raise_for_status()
+        return len(response.content)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(task, range(requests_count)))
+    return requests_count / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    with LocalTestServer(payload=b'{"code": 200, "data": []}' * 200) as server:
+        plain = benchmark(lambda u: requests.get(u, timeout=5), server.url)
+        pooled = benchmark(http_client.get, server.url)
+        print(f"requests.get  : {plain:.1f} req/s")
+        print(f"http_client   : {pooled:.1f} req/s")
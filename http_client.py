@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Author: unknown
+@Date: 2026-01-18
+@File: http_client.py
+"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from log_handle import app_logger  # 导入日志配置
+
+# 默认配置，可通过 configure() 修改
+DEFAULT_CONFIG = {
+    'pool_connections': 10,  # 缓存的主机连接池数量
+    'pool_maxsize': 16,  # 每个主机连接池的最大连接数
+    'connect_timeout': 5,  # 连接超时（秒）
+    'read_timeout': 30,  # 读取超时（秒）
+    'retries': 3,  # 最大重试次数
+    'backoff_factor': 0.5,  # 重试退避系数：0.5s, 1s, 2s...
+    'status_forcelist': (429, 500, 502, 503, 504),  # 需要重试的状态码
+}
+
+_config = dict(DEFAULT_CONFIG)
+_adapter = None
+_adapter_lock = threading.Lock()
+_local = threading.local()
+_logger = app_logger  # 使用全局logger
+
+
+def configure(**kwargs):
+    """
+    修改 HTTP 客户端配置，已创建的连接池会被丢弃并按新配置重建
+
+    Args:
+        **kwargs: DEFAULT_CONFIG 中的任意配置项
+    """
+    global _adapter
+    unknown = set(kwargs) - set(DEFAULT_CONFIG)
+    if unknown:
+        raise ValueError(f"未知的配置项: {', '.join(sorted(unknown))}")
+    with _adapter_lock:
+        _config.update(kwargs)
+        if _adapter is not None:
+            _adapter.close()
+        _adapter = None
+    _logger.info(f"HTTP客户端配置已更新: {kwargs}")
+
+
+def _get_adapter() -> HTTPAdapter:
+    """获取全局共享的连接池适配器（urllib3 连接池本身是线程安全的）"""
+    global _adapter
+    with _adapter_lock:
+        if _adapter is None:
+            retry = Retry(
+                total=_config['retries'],
+                backoff_factor=_config['backoff_factor'],
+                status_forcelist=_config['status_forcelist'],
+                allowed_methods=frozenset({'GET', 'HEAD', 'POST'}),
+                raise_on_status=False,
+            )
+            _adapter = HTTPAdapter(
+                pool_connections=_config['pool_connections'],
+                pool_maxsize=_config['pool_maxsize'],
+                max_retries=retry,
+            )
+        return _adapter
+
+
+def get_session() -> requests.Session:
+    """
+    获取当前线程的 Session
+
+    每个线程持有独立的 Session（Cookie、Header 状态互不干扰），
+    但所有 Session 共用同一个连接池适配器，从而复用 keep-alive 连接
+
+    Returns:
+        requests.Session: 会话对象
+    """
+    adapter = _get_adapter()
+    session = getattr(_local, 'session', None)
+    if session is None or getattr(_local, 'adapter', None) is not adapter:
+        session = requests.Session()
+        session.headers['Accept-Encoding'] = 'gzip, deflate'
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _local.session = session
+        _local.adapter = adapter
+    return session
+
+
+def default_timeout():
+    """默认的 (连接超时, 读取超时)"""
+    return _config['connect_timeout'], _config['read_timeout']
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """
+    发送请求，未指定 timeout 时使用默认超时
+
+    Args:
+        method (str): 请求方法
+        url (str): 请求地址
+        **kwargs: 透传给 requests.Session.request 的参数
+
+    Returns:
+        requests.Response: 响应对象
+    """
+    kwargs.setdefault('timeout', default_timeout())
+    return get_session().request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """发送 GET 请求"""
+    return request('GET', url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    """发送 POST 请求"""
+    return request('POST', url, **kwargs)
+
+
+def close():
+    """关闭所有连接池"""
+    global _adapter
+    with _adapter_lock:
+        if _adapter is not None:
+            _adapter.close()
+        _adapter = None
@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Author: unknown
+@Date: 2026-01-18
+@File: library.py
+"""
+
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from audio_probe import AudioInfo
+from mysqlite import SQLiteManager
+from song import Song
+from log_handle import app_logger  # 导入日志配置
+
+logger = app_logger  # 使用全局logger
+
+
+FAVORITE_COLUMNS = "id, title, author, pic, wording, musicing, play_url"
+
+
+TRIGRAM = 3  # trigram 索引能匹配的最短子串
+FTS_COLUMNS = ("title", "author", "wording", "musicing")
+
+_trigram_index: Dict[str, bool] = {}  # 数据库文件路径 -> 全文索引是否使用 trigram 分词
+
+
+def _has_trigram_index(db_path: str) -> bool:
+    """全文索引是否使用 trigram 分词（SQLite 低于 3.34 时迁移保留了 unicode61 索引）"""
+    if db_path not in _trigram_index:
+        rows = SQLiteManager(db_path).execute_query(
+            "SELECT sql FROM sqlite_master WHERE name = 'tb_library_fts'")
+        _trigram_index[db_path] = bool(rows) and 'trigram' in (rows[0]['sql'] or '')
+    return _trigram_index[db_path]
+
+
+def build_match_query(text: str, trigram: bool = True) -> Tuple[str, List[str]]:
+    """
+    将用户输入转换为 trigram 全文索引的查询条件：每个词匹配任意位置的子串，多个词之间为 AND
+    不足 3 个字符的词（如两个字的中文词）无法使用索引，改用 LIKE 匹配
+
+    Args:
+        text (str): 用户输入
+        trigram (bool): 索引是否使用 trigram 分词，否则所有词都用 LIKE 匹配
+
+    Returns:
+        Tuple[str, List[str]]: FTS5 MATCH 表达式（可能为空字符串），以及需要用 LIKE 匹配的短词
+    """
+    tokens = re.findall(r'\w+', text or '')
+    min_length = TRIGRAM if trigram else float('inf')
+    match = ' '.join(f'"{token}"' for token in tokens if len(token) >= min_length)
+    short = [token for token in tokens if len(token) < min_length]
+    return match, short
+
+
+def search_library(db_path: str, text: str, limit: int = 50) -> List[Song]:
+    """
+    在收藏和本地曲库中全文搜索，按相关度排序，同一首歌只返回一次
+
+    Args:
+        db_path (str): 数据库文件路径
+        text (str): 搜索关键字
+        limit (int): 最多返回的歌曲数
+
+    Returns:
+        List[Song]: 歌曲列表
+    """
+    if not (text or '').strip():
+        return []
+    try:
+        trigram = _has_trigram_index(db_path)
+    except Exception as e:
+        logger.error(f"读取全文索引结构失败: {e}")
+        return []
+    match, short = build_match_query(text, trigram)
+    if not match and not short:
+        return []
+    conditions, params = [], []
+    if match:
+        conditions.append("tb_library_fts MATCH ?")
+        params.append(match)
+    for token in short:
+        conditions.append("(" + " OR ".join(f"{column} LIKE ?" for column in FTS_COLUMNS) + ")")
+        params.extend([f"%{token}%"] * len(FTS_COLUMNS))
+    # 歌名和歌手的权重高于作词作曲；只有短词时没有相关度，最近添加的在前
+    order = "bm25(tb_library_fts, 10.0, 5.0, 1.0, 1.0)" if match else "rowid DESC"
+    try:
+        with SQLiteManager(db_path) as db:
+            rows = db.execute_query(
+                f"SELECT title, author, pic, wording, musicing, play_url FROM tb_library_fts "
+                f"WHERE {' AND '.join(conditions)} ORDER BY {order} LIMIT ?",
+                tuple(params) + (limit * 2,))
+    except Exception as e:
+        logger.error(f"本地曲库搜索失败: {e}, 关键字: {text}")
+        return []
+
+    songs = []
+    seen = set()
+    for row in rows:
+        song = Song.from_row(row)
+        if song.key in seen:
+            continue
+        seen.add(song.key)
+        songs.append(song)
+        if len(songs) >= limit:
+            break
+    return songs
+
+
+def record_local_track(db_path: str, song: Song, file_path: str, kind: str, info: Optional[AudioInfo] = None,
+                       content_hash: str = ''):
+    """
+    登记已缓存或已下载的歌曲，使其可以在本地搜索到
+
+    Args:
+        db_path (str): 数据库文件路径
+        song (Song): 歌曲信息
+        file_path (str): 本地文件路径
+        kind (str): 'cache' 或 'download'
+        info (AudioInfo): 下载时识别出的音频信息，未知时为None
+        content_hash (str): 文件内容 SHA-1 的十六进制字符串，见 blob_store.file_hasher
+    """
+    info = info or AudioInfo('')
+    try:
+        SQLiteManager(db_path).execute_update(
+            "INSERT INTO tb_local_track (title, author, pic, wording, musicing, play_url, file_path, kind, "
+            "format, bitrate, duration, content_hash) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (file_path) DO UPDATE SET "
+            "title = excluded.title, author = excluded.author, pic = excluded.pic, "
+            "wording = excluded.wording, musicing = excluded.musicing, play_url = excluded.play_url, "
+            "content_hash = CASE WHEN excluded.content_hash = '' THEN content_hash ELSE excluded.content_hash END, "
+            # 续传完成的下载没有音频信息，保留已有的
+            "format = CASE WHEN excluded.format = '' THEN format ELSE excluded.format END, "
+            "bitrate = CASE WHEN excluded.format = '' THEN bitrate ELSE excluded.bitrate END, "
+            "duration = CASE WHEN excluded.format = '' THEN duration ELSE excluded.duration END",
+            tuple(song) + (file_path, kind, info.format, info.bitrate, info.duration, content_hash))
+    except Exception as e:
+        logger.error(f"登记本地歌曲失败: {e}, 文件: {file_path}")
+
+
+def local_track_info(db_path: str, file_path: str) -> Optional[AudioInfo]:
+    """本地文件登记时记录的音频信息，没有记录或格式未知时返回None"""
+    row = SQLiteManager(db_path).select_one('tb_local_track', "file_path = ?", (file_path,))
+    if row is None or not row['format']:
+        return None
+    return AudioInfo(row['format'], row['bitrate'], 0, row['duration'])
+
+
+def local_track_hash(db_path: str, file_path: str) -> str:
+    """本地文件登记时记录的内容哈希，没有记录时返回空字符串"""
+    row = SQLiteManager(db_path).select_one('tb_local_track', "file_path = ?", (file_path,))
+    return row['content_hash'] if row is not None else ''
+
+
+def find_local_files(db_path: str, content_hash: str) -> List[str]:
+    """内容哈希相同的本地文件路径"""
+    if not content_hash:
+        return []
+    rows = SQLiteManager(db_path).execute_query(
+        "SELECT file_path FROM tb_local_track WHERE content_hash = ? ORDER BY id", (content_hash,))
+    return [row['file_path'] for row in rows]
+
+
+def latest_change_id(db_path: str) -> int:
+    """收藏变更日志中最新的变更ID，没有变更时返回0"""
+    with SQLiteManager(db_path) as db:
+        return db.execute_query("SELECT COALESCE(MAX(change_id), 0) FROM tb_collect_change")[0][0]
+
+
+def collect_changes(db_path: str, since: int) -> Tuple[int, Dict[int, Optional[object]]]:
+    """
+    读取 since 之后的收藏变更，同一条收藏的多次变更合并为最终状态
+
+    Args:
+        db_path (str): 数据库文件路径
+        since (int): 上次处理到的变更ID
+
+    Returns:
+        Tuple[int, Dict[int, Optional[sqlite3.Row]]]: 最新的变更ID，以及 收藏ID -> 当前记录（已删除为None）
+    """
+    with SQLiteManager(db_path) as db:
+        changes = db.select_all('tb_collect_change', "change_id > ?", (since,), order_by='change_id')
+        if not changes:
+            return since, {}
+        item_ids = list(dict.fromkeys(change['item_id'] for change in changes))
+        rows = {}
+        # 分批查询，避免超出 SQLite 的参数个数上限
+        for start in range(0, len(item_ids), 500):
+            batch = item_ids[start:start + 500]
+            placeholders = ', '.join(['?' for _ in batch])
+            for row in db.select_all('tb_collect_playlist', f"id IN ({placeholders})", tuple(batch)):
+                rows[row['id']] = row
+    return changes[-1]['change_id'], {item_id: rows.get(item_id) for item_id in item_ids}
+
+
+def prune_changes(db_path: str, upto: int):
+    """删除 upto 及之前的变更，全量加载后这些变更已经没有用处"""
+    try:
+        SQLiteManager(db_path).delete_many('tb_collect_change', "change_id <= ?", (upto,))
+    except Exception as e:
+        logger.error(f"清理收藏变更日志失败: {e}")
+
+
+def fetch_favorites(db_path: str, after_id: int = 0, limit: int = 200) -> List[Tuple[int, Song]]:
+    """
+    按 id 顺序读取一页收藏（keyset 分页，每页都走主键索引）
+
+    Args:
+        db_path (str): 数据库文件路径
+        after_id (int): 上一页最后一条收藏的ID
+        limit (int): 每页条数
+
+    Returns:
+        List[Tuple[int, Song]]: [(收藏ID, 歌曲), ...]
+    """
+    with SQLiteManager(db_path) as db:
+        rows = db.execute_query(
+            f"SELECT {FAVORITE_COLUMNS} FROM tb_collect_playlist WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, limit))
+    return [(row['id'], Song.from_row(row)) for row in rows]
+
+
+def fetch_favorites_between(db_path: str, first_id: int, last_id: int) -> List[Tuple[int, Song]]:
+    """读取 id 在 [first_id, last_id] 范围内的收藏"""
+    with SQLiteManager(db_path) as db:
+        rows = db.execute_query(
+            f"SELECT {FAVORITE_COLUMNS} FROM tb_collect_playlist WHERE id BETWEEN ? AND ? ORDER BY id",
+            (first_id, last_id))
+    return [(row['id'], Song.from_row(row)) for row in rows]
+
+
+def iter_favorites(db_path: str, chunk_size: int = 500) -> Iterator[Song]:
+    """按 id 顺序分页遍历全部收藏，不会一次性读入内存"""
+    last_id = 0
+    while True:
+        records = fetch_favorites(db_path, last_id, chunk_size)
+        for _, song in records:
+            yield song
+        if len(records) < chunk_size:
+            return
+        last_id = records[-1][0]
@@ -8,29 +8,53 @@
 
 from PyQt5.QtCore import QThread, pyqtSignal
 
-from mysqlite import SQLiteManager
+from library import fetch_favorites
+from log_handle import app_logger  # 导入日志配置
 
 
 class LoadingPlaylistThread(QThread):
-    """加载歌单数据的后台线程"""
-    data_loaded = pyqtSignal(list)  # 发射加载的数据
+    """分页加载歌单数据的后台线程"""
+    chunk_loaded = pyqtSignal(list)  # 发射一页数据 [(收藏ID, Song), ...]
+    load_finished = pyqtSignal(int)  # 发射加载的总条数，-1 表示加载失败
 
-    def __init__(self, db_path):
+    def __init__(self, db_path, after_id=0, chunk_size=200, max_rows=None):
+        """
+        Args:
+            db_path (str): 数据库文件路径
+            after_id (int): 从该ID之后开始加载
+            chunk_size (int): 每页条数
+            max_rows (int): 最多加载的条数，None 表示加载到末尾
+        """
         super().__init__()
         self.db_path = db_path
+        self.after_id = after_id
+        self.chunk_size = chunk_size
+        self.max_rows = max_rows
+        self.logger = app_logger  # 使用全局logger
+
+    def cancel(self):
+        """取消加载，当前页发射后停止"""
+        self.requestInterruption()
 
     def run(self):
-        """在后台执行数据库查询"""
+        """在后台按 id 分页查询（keyset 分页，每页都走主键索引）"""
+        total = 0
+        last_id = self.after_id
         try:
-            sqlite_manager = SQLiteManager(self.db_path)
-            # 查询数据库中的所有数据，按照id排序
-            data = sqlite_manager.select_all(
-                'tb_collect_playlist', 
-                condition="", 
-                params=None,
-                order_by='id'
-            )
-            self.data_loaded.emit(data)
+            while not self.isInterruptionRequested():
+                limit = self.chunk_size
+                if self.max_rows is not None:
+                    limit = min(limit, self.max_rows - total)
+                    if limit <= 0:
+                        break
+                data = fetch_favorites(self.db_path, last_id, limit)
+                if data:
+                    self.chunk_loaded.emit(data)
+                    total += len(data)
+                    last_id = data[-1][0]
+                if len(data) < limit:
+                    break
+            self.load_finished.emit(total)
         except Exception as e:
             self.logger.error(f"加载歌单数据失败: {e}")
-            self.data_loaded.emit([])  # 发送空列表表示加载失败
+            self.load_finished.emit(-1)  # 发送-1表示加载失败
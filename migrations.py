@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Author: unknown
+@Date: 2026-01-18
+@File: migrations.py
+"""
+
+import sqlite3
+
+from mysqlite import SQLiteManager
+from utils import make_song_key
+from log_handle import app_logger  # 导入日志配置
+
+logger = app_logger  # 使用全局logger
+
+TRIGRAM_MIN_VERSION = (3, 34, 0)  # FTS5 trigram 分词需要的 SQLite 版本
+
+
+def _create_collect_playlist(connection: sqlite3.Connection):
+    """收藏表"""
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS tb_collect_playlist ("
+        "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "title VARCHAR(255), "
+        "author VARCHAR(255), "
+        "pic VARCHAR(255), "
+        "wording VARCHAR(255), "
+        "musicing VARCHAR(255), "
+        "play_url VARCHAR(255), "
+        "create_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP, "
+        "active BOOLEAN DEFAULT 1"
+        ")"
+    )
+
+
+def _dedup_collect_playlist(connection: sqlite3.Connection):
+    """收藏表增加歌曲标识列，删除重复收藏，并建立唯一索引和查询索引"""
+    connection.create_function('song_key', 2, make_song_key, deterministic=True)
+    connection.execute("ALTER TABLE tb_collect_playlist ADD COLUMN song_key VARCHAR(512)")
+    connection.execute("UPDATE tb_collect_playlist SET song_key = song_key(title, author)")
+    # 同一首歌只保留最早的一条收藏
+    cursor = connection.execute(
+        "DELETE FROM tb_collect_playlist WHERE id NOT IN "
+        "(SELECT MIN(id) FROM tb_collect_playlist GROUP BY song_key)")
+    logger.info(f"删除重复收藏 {cursor.rowcount} 条")
+    connection.execute("CREATE UNIQUE INDEX idx_collect_song_key ON tb_collect_playlist (song_key)")
+    connection.execute("CREATE INDEX idx_collect_author_title ON tb_collect_playlist (author, title)")
+    connection.execute("CREATE INDEX idx_collect_create_time ON tb_collect_playlist (create_time)")
+    connection.execute("CREATE INDEX idx_collect_active ON tb_collect_playlist (active)")
+
+
+def _create_library_fts(connection: sqlite3.Connection):
+    """本地曲库表（已缓存/已下载的歌曲）和覆盖收藏与本地曲库的全文索引，由触发器保持同步"""
+    connection.execute(
+        "CREATE TABLE tb_local_track ("
+        "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "title VARCHAR(255), "
+        "author VARCHAR(255), "
+        "pic VARCHAR(255), "
+        "wording VARCHAR(255), "
+        "musicing VARCHAR(255), "
+        "play_url VARCHAR(255), "
+        "file_path VARCHAR(255) NOT NULL UNIQUE, "
+        "kind VARCHAR(16), "
+        "create_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP"
+        ")"
+    )
+    # 收藏的 rowid 为 id * 2，本地曲库的 rowid 为 id * 2 + 1，删除和更新时可按 rowid 定位
+    connection.execute(
+        "CREATE VIRTUAL TABLE tb_library_fts USING fts5("
+        "title, author, wording, musicing, "
+        "pic UNINDEXED, play_url UNINDEXED, "
+        "prefix='1 2 3'"
+        ")"
+    )
+    for table, offset in (('tb_collect_playlist', 0), ('tb_local_track', 1)):
+        columns = "title, author, wording, musicing, pic, play_url"
+        values = "NEW.title, NEW.author, NEW.wording, NEW.musicing, NEW.pic, NEW.play_url"
+        connection.execute(
+            f"CREATE TRIGGER trg_{table}_fts_insert AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO tb_library_fts (rowid, {columns}) VALUES (NEW.id * 2 + {offset}, {values}); "
+            f"END")
+        connection.execute(
+            f"CREATE TRIGGER trg_{table}_fts_delete AFTER DELETE ON {table} BEGIN "
+            f"DELETE FROM tb_library_fts WHERE rowid = OLD.id * 2 + {offset}; "
+            f"END")
+        connection.execute(
+            f"CREATE TRIGGER trg_{table}_fts_update AFTER UPDATE ON {table} BEGIN "
+            f"DELETE FROM tb_library_fts WHERE rowid = OLD.id * 2 + {offset}; "
+            f"INSERT INTO tb_library_fts (rowid, {columns}) VALUES (NEW.id * 2 + {offset}, {values}); "
+            f"END")
+    connection.execute(
+        "INSERT INTO tb_library_fts (rowid, title, author, wording, musicing, pic, play_url) "
+        "SELECT id * 2, title, author, wording, musicing, pic, play_url FROM tb_collect_playlist")
+
+
+def _create_collect_changelog(connection: sqlite3.Connection):
+    """收藏变更日志，由触发器记录每次插入、删除和更新，界面据此增量刷新"""
+    connection.execute(
+        "CREATE TABLE tb_collect_change ("
+        "change_id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "op VARCHAR(8) NOT NULL, "
+        "item_id INTEGER NOT NULL"
+        ")"
+    )
+    for op, event, row in (('insert', 'INSERT', 'NEW'), ('delete', 'DELETE', 'OLD'), ('update', 'UPDATE', 'NEW')):
+        connection.execute(
+            f"CREATE TRIGGER trg_tb_collect_playlist_change_{op} AFTER {event} ON tb_collect_playlist BEGIN "
+            f"INSERT INTO tb_collect_change (op, item_id) VALUES ('{op}', {row}.id); "
+            f"END")
+
+
+def _add_local_track_audio_info(connection: sqlite3.Connection):
+    """本地曲库记录下载时识别出的音频格式、码率和时长"""
+    connection.execute("ALTER TABLE tb_local_track ADD COLUMN format VARCHAR(8) DEFAULT ''")
+    connection.execute("ALTER TABLE tb_local_track ADD COLUMN bitrate INTEGER DEFAULT 0")
+    connection.execute("ALTER TABLE tb_local_track ADD COLUMN duration REAL DEFAULT 0")
+
+
+
+def _create_audio_cache(connection: sqlite3.Connection):
+    """音频缓存索引：按播放 URL 的哈希记录缓存文件的大小、访问记录和校验状态"""
+    connection.execute(
+        "CREATE TABLE tb_audio_cache ("
+        "url_hash VARCHAR(40) PRIMARY KEY, "
+        "song_key VARCHAR(512) DEFAULT '', "
+        "file_path VARCHAR(255) NOT NULL, "
+        "size INTEGER DEFAULT 0, "
+        "last_access REAL DEFAULT 0, "
+        "play_count INTEGER DEFAULT 0, "
+        "status VARCHAR(16) DEFAULT 'unverified', "
+        "create_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP"
+        ")"
+    )
+    connection.execute("CREATE INDEX idx_audio_cache_last_access ON tb_audio_cache (last_access)")
+    connection.execute("CREATE INDEX idx_audio_cache_song_key ON tb_audio_cache (song_key)")
+
+
+def _add_local_track_content_hash(connection: sqlite3.Connection):
+    """本地曲库记录文件内容的哈希，下载目录和缓存目录中内容相同的文件共用一份数据"""
+    connection.execute("ALTER TABLE tb_local_track ADD COLUMN content_hash VARCHAR(40) DEFAULT ''")
+    connection.execute("CREATE INDEX idx_local_track_content_hash ON tb_local_track (content_hash)")
+
+
+
+def _create_cache_and_job_tables(connection: sqlite3.Connection):
+    """搜索结果缓存表和下载任务表（之前由各自的类在启动时创建，已存在时保留数据）"""
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS tb_search_cache ("
+        "query TEXT NOT NULL, "
+        "page INTEGER NOT NULL, "
+        "source TEXT NOT NULL, "
+        "payload TEXT NOT NULL, "
+        "expire_time REAL NOT NULL, "
+        "last_access REAL NOT NULL, "
+        "PRIMARY KEY (query, page, source)"
+        ")"
+    )
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS tb_download_job ("
+        "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "url VARCHAR(255) NOT NULL, "
+        "title VARCHAR(255), "
+        "author VARCHAR(255), "
+        "dest_path VARCHAR(255) NOT NULL, "
+        "status VARCHAR(16) DEFAULT 'queued', "
+        "total_bytes INTEGER DEFAULT 0, "
+        "downloaded_bytes INTEGER DEFAULT 0, "
+        "error VARCHAR(255) DEFAULT '', "
+        "create_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP"
+        ")"
+    )
+
+
+
+def _use_trigram_fts(connection: sqlite3.Connection):
+    """
+    全文索引改用 trigram 分词：默认的 unicode61 把连续的中文当作一个词，只能从歌名开头匹配，
+    trigram 可以匹配任意位置的子串；SQLite 低于 3.34 时不支持，保留原来的索引，搜索改用 LIKE 匹配
+    """
+    if sqlite3.sqlite_version_info < TRIGRAM_MIN_VERSION:
+        logger.warning(f"SQLite {sqlite3.sqlite_version} 不支持 trigram 分词，本地搜索将使用 LIKE 匹配")
+        return
+    connection.execute("DROP TABLE tb_library_fts")
+    connection.execute(
+        "CREATE VIRTUAL TABLE tb_library_fts USING fts5("
+        "title, author, wording, musicing, "
+        "pic UNINDEXED, play_url UNINDEXED, "
+        "tokenize='trigram'"
+        ")"
+    )
+    # 触发器按表名写入，重建后继续生效，只需重新导入已有数据
+    for table, offset in (('tb_collect_playlist', 0), ('tb_local_track', 1)):
+        connection.execute(
+            f"INSERT INTO tb_library_fts (rowid, title, author, wording, musicing, pic, play_url) "
+            f"SELECT id * 2 + {offset}, title, author, wording, musicing, pic, play_url FROM {table}")
+
+
+# 按版本号顺序排列，已发布的迁移不能修改，只能追加
+MIGRATIONS = [
+    (1, "创建收藏表", _create_collect_playlist),
+    (2, "收藏去重并建立索引", _dedup_collect_playlist),
+    (3, "本地曲库和全文索引", _create_library_fts),
+    (4, "收藏变更日志", _create_collect_changelog),
+    (5, "本地曲库音频信息", _add_local_track_audio_info),
+    (6, "音频缓存索引", _create_audio_cache),
+    (7, "本地曲库内容哈希", _add_local_track_content_hash),
+    (8, "搜索缓存表和下载任务表", _create_cache_and_job_tables),
+    (9, "全文索引改用 trigram 分词", _use_trigram_fts),
+]
+
+
+def get_version(db_path: str) -> int:
+    """数据库当前的结构版本"""
+    with SQLiteManager(db_path) as db:
+        return db.execute_query("PRAGMA user_version")[0][0]
+
+
+def migrate(db_path: str) -> int:
+    """
+    将数据库升级到最新的结构版本，每个迁移在单独的事务中执行，失败时回滚
+
+    Args:
+        db_path (str): 数据库文件路径
+
+    Returns:
+        int: 升级后的版本号
+    """
+    with SQLiteManager(db_path) as db:
+        connection = db.connection
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        for target, description, upgrade in MIGRATIONS:
+            if target <= version:
+                continue
+            logger.info(f"执行数据库迁移 {target}: {description}")
+            try:
+                connection.execute("BEGIN IMMEDIATE")
+                upgrade(connection)
+                connection.execute(f"PRAGMA user_version = {target}")
+                connection.commit()
+            except sqlite3.Error as e:
+                connection.rollback()
+                logger.error(f"数据库迁移 {target} 失败: {e}")
+                raise
+            version = target
+        return version
@@ -8,89 +8,222 @@
 
 import os
 from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
-from PyQt5.QtCore import QUrl
-
-class MusicPlayer:
-    def __init__(self):
-        self.player = QMediaPlayer()
-        # 连接播放状态信号
-        self.player.positionChanged.connect(self.position_changed)
-        self.player.durationChanged.connect(self.duration_changed)
-        self.player.mediaStatusChanged.connect(self.status_changed)
-        
+from PyQt5.QtCore import QObject, QUrl, pyqtSignal
+
+from play_queue import PlayQueue
+from log_handle import app_logger  # 导入日志配置
+
+
+class MusicPlayer(QObject):
+    """
+    音乐播放器
+    内部有两个 QMediaPlayer：一个正在播放，另一个预先打开播放队列中的下一首，
+    当前歌曲播放结束时直接切换到已打开的播放器，避免切歌时重新打开和解码的停顿
+    """
+    positionChanged = pyqtSignal('qint64')  # 当前歌曲的播放位置（毫秒）
+    durationChanged = pyqtSignal('qint64')  # 当前歌曲的总时长（毫秒）
+    stateChanged = pyqtSignal(int)  # QMediaPlayer.State
+    track_changed = pyqtSignal(object)  # 开始播放队列中的一项
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.player = self._create_player()
+        # 备用播放器，预加载队列中的下一首
+        self._standby = self._create_player()
+        self._standby_index = -1
+        self._standby_media = (None, None)  # 备用播放器的 (stream_url, current_file)
+
         self.current_file = None
+        self.stream_url = None  # 边下边播时的本地代理地址
 
-    def load_file(self, file_path):
-        """加载音频文件"""
-        try:
-            # 直接使用URL方式
-            url = QUrl.fromLocalFile(file_path)
-            self.player.setMedia(QMediaContent(url))
-            self.current_file = file_path
+        # 播放队列
+        self.queue = PlayQueue()
+        # 队列项 -> (边下边播地址或None, 本地文件路径)，由调用方提供
+        self.resolver = None
+        self.logger = app_logger  # 使用全局logger
+
+    def _create_player(self):
+        player = QMediaPlayer(self)
+        # 只转发正在播放的播放器的信号
+        player.positionChanged.connect(lambda value, p=player: self._is_active(p) and self.position_changed(value))
+        player.durationChanged.connect(lambda value, p=player: self._is_active(p) and self.duration_changed(value))
+        player.stateChanged.connect(lambda state, p=player: self._is_active(p) and self.stateChanged.emit(state))
+        player.mediaStatusChanged.connect(lambda status, p=player: self._is_active(p) and self.status_changed(status))
+        return player
+
+    def _is_active(self, player):
+        return player is self.player
+
+    @staticmethod
+    def _media(stream_url, file_path):
+        url = QUrl(stream_url) if stream_url else QUrl.fromLocalFile(file_path)
+        return QMediaContent(url)
+
+    def play(self):
+        """播放或暂停当前歌曲，没有可播放的歌曲时返回False，由调用方处理默认播放"""
+        if self.is_playing():
+            # 如果正在播放，则暂停
+            self.player.pause()
+        elif self.stream_url or (self.current_file and os.path.exists(self.current_file)):
+            # 如果有当前文件且文件存在，则继续播放
+            self.player.play()
             return True
-        except Exception as e:
-            print(f"Error loading file: {e}")
+        else:
             return False
-    
-    def play(self, file_path=None):
-        """播放音频 - 支持指定文件播放或继续播放当前文件"""
-        if file_path:
-            # 如果指定了文件路径，则加载并播放
-            if self.load_file(file_path):
-                self.player.play()
-                return True
-            else:
-                return False
+
+    def set_queue(self, items, index=0):
+        """
+        设置播放队列并从 index 开始播放
+
+        Args:
+            items (list): 队列项，由 resolver 转换为播放地址
+            index (int): 开始播放的位置
+        """
+        self.queue.set_items(items, index)
+        self._clear_standby()
+        return self.play_index(index)
+
+    @property
+    def index(self):
+        """当前歌曲在队列中的位置，没有时为-1"""
+        return self.queue.current_index()
+
+    @property
+    def preloaded_file(self):
+        """备用播放器预加载的歌曲的本地文件路径，没有时为None"""
+        return self._standby_media[1]
+
+    def set_mode(self, mode):
+        """切换播放模式（见 play_queue），并重新预加载下一首"""
+        self.queue.set_mode(mode)
+        if self.index >= 0:
+            self._preload(self.queue.next_index(auto=True))
+
+    def upcoming(self, count):
+        """当前歌曲之后将要播放的最多 count 项"""
+        return self.queue.upcoming(count)
+
+    def play_index(self, index):
+        """播放队列中的第 index 项，已预加载时直接切换"""
+        if not 0 <= index < len(self.queue) or self.resolver is None:
+            return False
+        if index == self._standby_index and self._standby.mediaStatus() != QMediaPlayer.InvalidMedia:
+            self._swap_players()
         else:
-            # 如果没有指定文件路径
-            if self.is_playing():
-                # 如果正在播放，则暂停
-                self.player.pause()
-            elif self.current_file and os.path.exists(self.current_file):
-                # 如果有当前文件且文件存在，则继续播放
-                self.player.play()
-                return True
-            else:
-                # 如果没有当前播放文件，则返回False，让调用方处理默认播放
+            if index == self._standby_index:
+                # 预加载失败（如边下边播中断），重新打开
+                self._clear_standby()
+            try:
+                stream_url, file_path = self.resolver(self.queue[index])
+                self.player.setMedia(self._media(stream_url, file_path))
+            except Exception as e:
+                self.logger.error(f"加载播放队列中的歌曲失败: {e}", exc_info=True)
                 return False
-    
+            self.stream_url, self.current_file = stream_url, file_path
+            self.player.play()
+        self.queue.move_to(index)
+        self._preload(self.queue.next_index(auto=True))
+        self.track_changed.emit(self.queue[index])
+        return True
+
+    def next(self):
+        """播放下一首"""
+        index = self.queue.next_index()
+        if index < 0:
+            return False
+        return self.play_index(index)
+
+    def previous(self):
+        """播放上一首"""
+        index = self.queue.previous_index()
+        if index < 0:
+            return False
+        return self.play_index(index)
+
+    def _preload(self, index):
+        """在备用播放器中打开第 index 项（只打开不播放）"""
+        if index == self._standby_index and index >= 0:
+            return
+        self._clear_standby()
+        if index < 0:
+            return
+        try:
+            stream_url, file_path = self.resolver(self.queue[index])
+            self._standby.setMedia(self._media(stream_url, file_path))
+        except Exception as e:
+            self.logger.error(f"预加载播放队列中的歌曲失败: {e}", exc_info=True)
+            return
+        self._standby.setVolume(self.player.volume())
+        self._standby_index = index
+        self._standby_media = (stream_url, file_path)
+
+    def discard_preload(self):
+        """丢弃预加载的下一首，切歌时重新打开"""
+        self._clear_standby()
+
+    def _clear_standby(self):
+        self._standby.stop()
+        self._standby.setMedia(QMediaContent())
+        self._standby_index = -1
+        self._standby_media = (None, None)
+
+    def _swap_players(self):
+        """切换到已预加载的备用播放器"""
+        previous = self.player
+        self.player, self._standby = self._standby, previous
+        self.player.play()
+        previous.stop()
+        self.stream_url, self.current_file = self._standby_media
+        self._standby_index = -1
+        self._standby_media = (None, None)
+        # 备用播放器加载时的时长信号没有转发
+        self.duration_changed(self.player.duration())
+        self.position_changed(self.player.position())
+
     def pause(self):
         """暂停播放"""
         self.player.pause()
-    
+
     def stop(self):
         """停止播放"""
         self.player.stop()
-    
+
     def set_volume(self, volume):
         """设置音量 (0-100)"""
         self.player.setVolume(volume)
-    
+        self._standby.setVolume(volume)
+
     def set_position(self, position):
         """设置播放位置（毫秒）"""
         self.player.setPosition(position)
-    
+
     def get_position(self):
         """获取当前播放位置"""
         return self.player.position()
-    
+
     def get_duration(self):
         """获取总时长"""
         return self.player.duration()
-    
+
     def is_playing(self):
         """检查是否正在播放"""
-        return self.player.state() == QMediaPlayer().PlayingState
-    
+        return self.player.state() == QMediaPlayer.PlayingState
+
     # 回调函数
     def position_changed(self, position):
         # 播放进度变化时调用
-        pass
-    
+        self.positionChanged.emit(position)
+
     def duration_changed(self, duration):
         # 音频总时长变化时调用
-        pass
-    
+        self.durationChanged.emit(duration)
+
     def status_changed(self, status):
-        # 媒体状态变化时调用
-        pass
+        # 媒体状态变化时调用：播放结束后自动切到下一首
+        if status == QMediaPlayer.EndOfMedia:
+            index = self.queue.next_index(auto=True)
+            if index >= 0:
+                self.play_index(index)
+        elif status == QMediaPlayer.InvalidMedia and self._standby_index >= 0:
+            # 预加载的下一首也一并作废，切歌时重新打开
+            self._clear_standby()
@@ -7,11 +7,110 @@
 """
 
 import sqlite3
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
 from typing import List, Tuple, Optional, Union
 import os
 from log_handle import app_logger  # 导入日志配置
 
 
+class ConnectionPool:
+    """
+    SQLite连接池
+    同一数据库的连接在 SQLiteManager 之间复用（可跨线程，但同一时刻只归一个 SQLiteManager 使用），
+    新连接统一配置 WAL 日志模式和性能相关的 PRAGMA，使界面线程和后台线程可以同时读写
+    """
+
+    # 新连接执行的 PRAGMA，journal_mode 会持久化到数据库文件
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",  # 读写互不阻塞
+        "PRAGMA synchronous=NORMAL",  # WAL 模式下安全且减少 fsync
+        "PRAGMA cache_size=-8000",  # 页缓存 8MB
+        "PRAGMA mmap_size=67108864",  # 内存映射 64MB
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA foreign_keys=ON",
+    )
+
+    def __init__(self, max_idle: int = 4, timeout: float = 10.0, cached_statements: int = 256):
+        """
+        初始化连接池
+
+        Args:
+            max_idle (int): 每个数据库最多保留的空闲连接数
+            timeout (float): 等待写锁的超时时间（秒）
+            cached_statements (int): 每个连接缓存的预编译语句数
+        """
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self.logger = app_logger  # 使用全局logger
+        self._lock = threading.Lock()
+        self._idle = defaultdict(list)  # 数据库路径 -> 空闲连接列表
+
+    def acquire(self, db_path: str) -> sqlite3.Connection:
+        """
+        取出一个连接，没有空闲连接时新建
+
+        Args:
+            db_path (str): 数据库文件路径
+
+        Returns:
+            sqlite3.Connection: 数据库连接
+        """
+        key = os.path.abspath(db_path)
+        with self._lock:
+            if self._idle[key]:
+                return self._idle[key].pop()
+        return self._open(db_path)
+
+    def release(self, db_path: str, connection: sqlite3.Connection):
+        """
+        归还连接，未提交的事务会被回滚，空闲连接过多时直接关闭
+
+        Args:
+            db_path (str): 数据库文件路径
+            connection (sqlite3.Connection): 数据库连接
+        """
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+        except sqlite3.Error as e:
+            self.logger.error(f"归还连接时回滚失败: {e}")
+            connection.close()
+            return
+        key = os.path.abspath(db_path)
+        with self._lock:
+            if len(self._idle[key]) < self.max_idle:
+                self._idle[key].append(connection)
+                return
+        connection.close()
+
+    def close_all(self):
+        """关闭所有空闲连接"""
+        with self._lock:
+            idle, self._idle = self._idle, defaultdict(list)
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+        self.logger.debug("连接池已关闭")
+
+    def _open(self, db_path: str) -> sqlite3.Connection:
+        """新建并配置连接"""
+        connection = sqlite3.connect(db_path, timeout=self.timeout,
+                                     cached_statements=self.cached_statements,
+                                     check_same_thread=False)
+        connection.row_factory = sqlite3.Row  # 使结果可以通过列名访问
+        for pragma in self.PRAGMAS:
+            connection.execute(pragma)
+        self.logger.debug(f"数据库连接已建立: {db_path}")
+        return connection
+
+
+# 全局连接池
+connection_pool = ConnectionPool()
+
+
 class SQLiteManager:
     """
     SQLite数据库操作封装类
@@ -29,6 +128,7 @@ class SQLiteManager:
         self.logger = app_logger  # 使用全局logger
         self.ensure_db_exists()
         self.connection = None
+        self._transaction_depth = 0
         self._connect()
 
     def ensure_db_exists(self):
@@ -41,23 +141,62 @@ class SQLiteManager:
             conn.close()
             self.logger.info(f"数据库文件 {self.db_path} 已创建")
         else:
-            self.logger.info(f"数据库文件 {self.db_path} 已存在")
+            self.logger.debug(f"数据库文件 {self.db_path} 已存在")
 
     def _connect(self):
-        """建立数据库连接"""
+        """从连接池取得数据库连接"""
         try:
-            self.connection = sqlite3.connect(self.db_path)
-            self.connection.row_factory = sqlite3.Row  # 使结果可以通过列名访问
-            self.logger.debug(f"数据库连接已建立: {self.db_path}")
+            self.connection = connection_pool.acquire(self.db_path)
         except sqlite3.Error as e:
             self.logger.error(f"数据库连接失败: {e}")
             raise
 
+    def _commit(self):
+        """提交事务，处于 transaction() 中时推迟到事务结束"""
+        if self._transaction_depth == 0:
+            self.connection.commit()
+
+    def _rollback(self):
+        """回滚事务，处于 transaction() 中时由事务统一回滚"""
+        if self._transaction_depth == 0:
+            self.connection.rollback()
+
+    @contextmanager
+    def transaction(self):
+        """
+        事务上下文，块内的所有写操作合并为一次提交，发生异常时全部回滚，可嵌套
+
+        用法:
+            with db.transaction():
+                db.insert_one(...)
+                db.delete_one(...)
+        """
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                self.connection.rollback()
+                self.logger.warning(f"事务已回滚: {self.db_path}")
+            raise
+        else:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                self.connection.commit()
+
     def close(self):
-        """关闭数据库连接"""
+        """将数据库连接归还连接池"""
         if self.connection:
-            self.connection.close()
-            self.logger.debug(f"数据库连接已关闭: {self.db_path}")
+            connection_pool.release(self.db_path, self.connection)
+            self.connection = None
+
+    def __del__(self):
+        """对象释放时归还连接"""
+        try:
+            self.close()
+        except Exception:
+            pass
 
     def execute_query(self, query: str, params: Optional[Tuple] = None) -> List[sqlite3.Row]:
         """
@@ -100,12 +239,12 @@ class SQLiteManager:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
-            self.connection.commit()
+            self._commit()
             affected_rows = cursor.rowcount
             self.logger.info(f"更新执行成功: {affected_rows} 行受到影响, Query: {query[:50]}...")
             return affected_rows
         except sqlite3.Error as e:
-            self.connection.rollback()
+            self._rollback()
             self.logger.error(f"更新执行失败: {e}, Query: {query}")
             raise
 
@@ -127,12 +266,12 @@ class SQLiteManager:
         try:
             cursor = self.connection.cursor()
             cursor.execute(query, tuple(data.values()))
-            self.connection.commit()
+            self._commit()
             last_row_id = cursor.lastrowid
             self.logger.info(f"单条数据插入成功: 表={table}, ID={last_row_id}")
             return last_row_id
         except sqlite3.Error as e:
-            self.connection.rollback()
+            self._rollback()
             self.logger.error(f"单条插入失败: {e}, Table: {table}, Data: {data}")
             raise
 
@@ -152,14 +291,15 @@ class SQLiteManager:
 
             self.logger.info(f"开始批量插入数据，表名: {table_name}, 待插入记录数: {len(data_list)}")
 
-            with self.connection:
-                cursor = self.connection.cursor()
-                cursor.executemany(query, values_list)
-                affected_rows = cursor.rowcount
-                self.logger.info(f"批量插入完成，表名: {table_name}, 实际插入记录数: {affected_rows}")
-                return affected_rows
+            cursor = self.connection.cursor()
+            cursor.executemany(query, values_list)
+            self._commit()
+            affected_rows = cursor.rowcount
+            self.logger.info(f"批量插入完成，表名: {table_name}, 实际插入记录数: {affected_rows}")
+            return affected_rows
 
         except sqlite3.Error as e:
+            self._rollback()
             self.logger.error(f"批量插入失败: {e}, Table: {table_name}, 待插入记录数: {len(data_list)}")
             return 0
 
@@ -250,12 +390,12 @@ class SQLiteManager:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
-            self.connection.commit()
+            self._commit()
             affected_rows = cursor.rowcount
             self.logger.info(f"单条删除执行成功: 表={table}, 删除{affected_rows}行, Condition: {condition}")
             return affected_rows
         except sqlite3.Error as e:
-            self.connection.rollback()
+            self._rollback()
             self.logger.error(f"单条删除失败: {e}, Query: {query}")
             raise
 
@@ -279,12 +419,12 @@ class SQLiteManager:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
-            self.connection.commit()
+            self._commit()
             affected_rows = cursor.rowcount
             self.logger.info(f"批量删除执行成功: 表={table}, 删除{affected_rows}行, Condition: {condition}")
             return affected_rows
         except sqlite3.Error as e:
-            self.connection.rollback()
+            self._rollback()
             self.logger.error(f"批量删除失败: {e}, Query: {query}")
             raise
 
@@ -300,10 +440,10 @@ class SQLiteManager:
         try:
             cursor = self.connection.cursor()
             cursor.execute(query)
-            self.connection.commit()
+            self._commit()
             self.logger.info(f"表创建成功或已存在: {table_name}")
         except sqlite3.Error as e:
-            self.connection.rollback()
+            self._rollback()
             self.logger.error(f"创建表失败: {e}, Query: {query}")
             raise
 
@@ -312,10 +452,114 @@ class SQLiteManager:
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """上下文管理器出口，自动关闭连接"""
+        """上下文管理器出口，自动归还连接"""
         self.close()
 
 
+class WriteBehindQueue:
+    """
+    后写队列
+    调用方只把写操作放入队列，后台线程在积累到 max_batch 条或距上次写入超过 flush_interval 秒时，
+    用一个事务批量写入，适合收藏导入、播放记录等大量零散的小写入
+    """
+
+    def __init__(self, db_path: str, max_batch: int = 500, flush_interval: float = 1.0):
+        """
+        初始化后写队列
+
+        Args:
+            db_path (str): 数据库文件路径
+            max_batch (int): 触发写入的条数阈值
+            flush_interval (float): 触发写入的时间阈值（秒）
+        """
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.logger = app_logger  # 使用全局logger
+
+        self._condition = threading.Condition()
+        self._pending = []  # [(query, params), ...]
+        self._submitted = 0  # 已入队的写操作数
+        self._written = 0  # 已处理（写入或丢弃）的写操作数
+        self._flush_target = 0  # flush() 要求写完的操作数
+        self._stopped = False
+        self._thread = threading.Thread(target=self._work, name="sqlite-write-behind", daemon=True)
+        self._thread.start()
+
+    def execute(self, query: str, params: Optional[Tuple] = None):
+        """
+        写操作入队
+
+        Args:
+            query (str): SQL更新语句
+            params (Optional[Tuple]): 参数
+        """
+        with self._condition:
+            if self._stopped:
+                raise RuntimeError("后写队列已关闭")
+            self._pending.append((query, params or ()))
+            self._submitted += 1
+            if len(self._pending) >= self.max_batch:
+                self._condition.notify_all()
+
+    def insert(self, table: str, data: dict):
+        """单条插入入队"""
+        columns = ', '.join(data.keys())
+        placeholders = ', '.join(['?' for _ in data])
+        self.execute(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", tuple(data.values()))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        立即写入队列中的全部操作并等待完成
+
+        Returns:
+            bool: 是否在超时前完成
+        """
+        with self._condition:
+            target = self._submitted
+            self._flush_target = max(self._flush_target, target)
+            self._condition.notify_all()
+            return self._condition.wait_for(lambda: self._written >= target, timeout)
+
+    def close(self):
+        """写入剩余操作并停止后台线程"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    def _work(self):
+        """后台线程主循环：达到条数阈值、收到 flush 请求、停止或超过时间阈值时写入"""
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: (self._stopped or len(self._pending) >= self.max_batch
+                             or self._flush_target > self._written),
+                    self.flush_interval)
+                batch, self._pending = self._pending, []
+                stopped = self._stopped
+
+            if batch:
+                self._write(batch)
+            with self._condition:
+                self._written += len(batch)
+                self._condition.notify_all()
+            if stopped:
+                return
+
+    def _write(self, batch):
+        """用一个事务写入一批操作"""
+        try:
+            with SQLiteManager(self.db_path) as db:
+                with db.transaction():
+                    cursor = db.connection.cursor()
+                    for query, params in batch:
+                        cursor.execute(query, params)
+            self.logger.debug(f"后写队列提交 {len(batch)} 条写操作")
+        except sqlite3.Error as e:
+            self.logger.error(f"后写队列写入失败，丢弃 {len(batch)} 条写操作: {e}")
+
+
 # 使用示例
 if __name__ == "__main__":
     # 示例：如何使用SQLiteManager类
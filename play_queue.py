@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Author: unknown
+@Date: 2026-01-18
+@File: play_queue.py
+"""
+
+import random
+from typing import List
+
+# 播放模式
+MODE_SEQUENTIAL = 'sequential'  # 顺序播放，播完停止
+MODE_REPEAT_ALL = 'repeat_all'  # 列表循环
+MODE_REPEAT_ONE = 'repeat_one'  # 单曲循环
+MODE_SHUFFLE = 'shuffle'  # 随机播放（列表循环）
+
+MODE_NAMES = {
+    MODE_SEQUENTIAL: "顺序播放",
+    MODE_REPEAT_ALL: "列表循环",
+    MODE_REPEAT_ONE: "单曲循环",
+    MODE_SHUFFLE: "随机播放",
+}
+MODES = list(MODE_NAMES)
+
+
+class PlayQueue:
+    """
+    播放队列
+    保存队列项和播放顺序：顺序模式下播放顺序就是队列顺序，随机模式下是以当前歌曲开头的打乱排列，
+    因此下一首、上一首和后续几首都可以提前确定（供预加载和预缓存使用）
+    """
+
+    def __init__(self, mode: str = MODE_SEQUENTIAL):
+        self.items = []
+        self.mode = mode
+        self._order: List[int] = []  # 播放顺序，元素为队列项的下标
+        self._position = -1  # 当前歌曲在播放顺序中的位置
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def set_items(self, items, index: int = 0):
+        """替换队列，index 为将要播放的队列项"""
+        self.items = list(items)
+        self._build_order(index)
+
+    def set_mode(self, mode: str):
+        """切换播放模式，当前歌曲不变"""
+        if mode not in MODE_NAMES:
+            raise ValueError(f"未知的播放模式: {mode}")
+        current = self.current_index()
+        self.mode = mode
+        self._build_order(current)
+
+    def current_index(self) -> int:
+        """当前歌曲的队列下标，没有时返回-1"""
+        if 0 <= self._position < len(self._order):
+            return self._order[self._position]
+        return -1
+
+    def move_to(self, index: int):
+        """将队列项 index 设为当前歌曲"""
+        if not 0 <= index < len(self.items):
+            return
+        if self._order and self._order[self._position] == index:
+            return
+        if self.mode == MODE_SHUFFLE:
+            # 随机顺序中跳到指定歌曲，后续仍按原来的随机顺序
+            self._position = self._order.index(index)
+        else:
+            self._position = index
+
+    def next_index(self, auto: bool = False) -> int:
+        """
+        下一首的队列下标，没有下一首时返回-1
+
+        Args:
+            auto (bool): 是否为播放结束后自动切歌，单曲循环只对自动切歌生效
+        """
+        if not self._order:
+            return -1
+        if auto and self.mode == MODE_REPEAT_ONE:
+            return self.current_index()
+        position = self._position + 1
+        if position >= len(self._order):
+            if self.mode == MODE_SEQUENTIAL:
+                return -1
+            position = 0
+        return self._order[position]
+
+    def previous_index(self) -> int:
+        """上一首的队列下标，没有上一首时返回-1"""
+        if not self._order:
+            return -1
+        position = self._position - 1
+        if position < 0:
+            if self.mode == MODE_SEQUENTIAL:
+                return -1
+            position = len(self._order) - 1
+        return self._order[position]
+
+    def upcoming(self, count: int) -> list:
+        """
+        当前歌曲之后将要播放的最多 count 项（不含当前歌曲，不重复）
+        单曲循环时按手动切歌的顺序计算
+        """
+        if not self._order:
+            return []
+        positions = range(self._position + 1, self._position + 1 + count)
+        if self.mode == MODE_SEQUENTIAL:
+            indexes = [self._order[p] for p in positions if p < len(self._order)]
+        else:
+            indexes = [self._order[p % len(self._order)] for p in positions]
+        result = []
+        seen = {self.current_index()}
+        for index in indexes:
+            if index not in seen:
+                seen.add(index)
+                result.append(self.items[index])
+        return result
+
+    def _build_order(self, current: int):
+        """重新生成播放顺序，current 为当前歌曲"""
+        count = len(self.items)
+        if not 0 <= current < count:
+            current = 0 if count else -1
+        if self.mode == MODE_SHUFFLE and count:
+            rest = [i for i in range(count) if i != current]
+            random.shuffle(rest)
+            self._order = [current] + rest
+            self._position = 0
+        else:
+            self._order = list(range(count))
+            self._position = current
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Author: unknown
+@Date: 2026-01-18
+@File: progress_tracker.py
+"""
+
+from PyQt5.QtCore import QEvent, QObject, QTimer
+
+
+class ProgressTracker(QObject):
+    """
+    播放进度条的更新
+    由播放器的 positionChanged/durationChanged 信号驱动，信号只记录最新值，
+    单次定时器把一段时间内的多次变化合并为一次刷新；拖动进度条或窗口不可见时不刷新，
+    没有播放时播放器不发信号，也就没有任何定时器在运行
+    """
+
+    def __init__(self, music_player, slider, interval: int = 250, parent=None):
+        """
+        初始化进度更新
+
+        Args:
+            music_player (MusicPlayer): 播放器
+            slider (QSlider): 进度条，范围为 0-100
+            interval (int): 两次刷新的最小间隔（毫秒）
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.slider = slider
+        self.seeking = False
+        self._position = 0
+        self._duration = 0
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self._refresh)
+
+        music_player.positionChanged.connect(self._on_position_changed)
+        music_player.durationChanged.connect(self._on_duration_changed)
+        # 窗口重新显示时补上隐藏期间的进度
+        self._window = slider.window()
+        self._window.installEventFilter(self)
+
+    def set_seeking(self, seeking: bool):
+        """用户拖动进度条期间暂停刷新"""
+        self.seeking = seeking
+        if not seeking:
+            self._schedule()
+
+    def reset(self):
+        """清零进度条"""
+        self._timer.stop()
+        self._position = 0
+        self.slider.setValue(0)
+
+    def eventFilter(self, obj, event):
+        if obj is self._window and event.type() in (QEvent.Show, QEvent.WindowStateChange):
+            self._schedule()
+        return False
+
+    def _on_position_changed(self, position):
+        self._position = position
+        self._schedule()
+
+    def _on_duration_changed(self, duration):
+        self._duration = duration
+        self._schedule()
+
+    def _is_visible(self):
+        return self.slider.isVisible() and not self._window.isMinimized()
+
+    def _schedule(self):
+        if not self._timer.isActive() and not self.seeking and self._is_visible():
+            self._timer.start()
+
+    def _refresh(self):
+        if self.seeking or not self._is_visible() or self._duration <= 0:
+            return
+        progress = min(int(self._position * 100 / self._duration), 100)
+        if progress != self.slider.value():
+            self.slider.setValue(progress)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Author: unknown
+@Date: 2026-01-18
+@File: search_cache.py
+"""
+
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from get_music import get_music
+from mysqlite import SQLiteManager
+from song import Song
+from log_handle import app_logger  # 导入日志配置
+
+
+class SearchCache:
+    """
+    搜索结果缓存
+    以 (规范化关键字, 页码, 来源) 为键，内存 LRU + SQLite 持久化两级缓存，支持 TTL 过期
+    """
+    TABLE = 'tb_search_cache'  # 由 migrations 创建
+
+    def __init__(self, db_path: str, max_entries: int = 128, max_disk_entries: int = 2000,
+                 ttl: int = 6 * 3600):
+        """
+        初始化搜索缓存
+
+        Args:
+            db_path (str): 数据库文件路径（需已执行迁移）
+            max_entries (int): 内存中最多缓存的结果页数
+            max_disk_entries (int): 磁盘中最多缓存的结果页数
+            ttl (int): 缓存有效期（秒）
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+        self.table = self.TABLE
+        self.logger = app_logger  # 使用全局logger
+
+        self._memory = OrderedDict()  # key -> (过期时间, 歌曲列表)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize_query(name: str) -> str:
+        """规范化搜索关键字：去首尾空白、合并连续空白、忽略大小写"""
+        return re.sub(r'\s+', ' ', (name or '').strip()).casefold()
+
+    def make_key(self, name: str, page: int, source: str) -> Tuple[str, int, str]:
+        return self.normalize_query(name), int(page), source
+
+    def peek(self, name: str, page: int = 1, source: str = 'netease') -> Optional[List[Song]]:
+        """
+        仅查询内存缓存，不访问磁盘
+
+        Returns:
+            Optional[List[Song]]: 命中时返回歌曲列表副本，否则返回None
+        """
+        key = self.make_key(name, page, source)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expire_time, songs = entry
+            if expire_time < time.time():
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return list(songs)
+
+    def get(self, name: str, page: int = 1, source: str = 'netease') -> Optional[List[Song]]:
+        """
+        查询缓存，先查内存再查磁盘，磁盘命中后回填内存
+
+        Returns:
+            Optional[List[Song]]: 命中时返回歌曲列表副本，否则返回None
+        """
+        songs = self.peek(name, page, source)
+        if songs is not None:
+            self.logger.debug(f"搜索缓存命中(内存): {name}, 页码: {page}")
+            return songs
+
+        query, page, source = self.make_key(name, page, source)
+        now = time.time()
+        try:
+            sqlite_manager = SQLiteManager(self.db_path)
+            row = sqlite_manager.select_one(self.table, "query = ? AND page = ? AND source = ?",
+                                            (query, page, source))
+            if row is None:
+                return None
+            if row['expire_time'] < now:
+                sqlite_manager.delete_one(self.table, "query = ? AND page = ? AND source = ?",
+                                          (query, page, source))
+                return None
+            sqlite_manager.execute_update(
+                f"UPDATE {self.table} SET last_access = ? WHERE query = ? AND page = ? AND source = ?",
+                (now, query, page, source))
+            songs = tuple(Song.from_list(song) for song in json.loads(row['payload']))
+        except Exception as e:
+            self.logger.error(f"读取搜索缓存失败: {e}")
+            return None
+
+        self._remember((query, page, source), row['expire_time'], songs)
+        self.logger.debug(f"搜索缓存命中(磁盘): {name}, 页码: {page}")
+        return list(songs)
+
+    def put(self, name: str, page: int, source: str, songs: List[Song]):
+        """
+        写入缓存（内存和磁盘）
+
+        Args:
+            name (str): 搜索关键字
+            page (int): 页码
+            source (str): 搜索来源
+            songs (List[Song]): 歌曲列表
+        """
+        key = self.make_key(name, page, source)
+        now = time.time()
+        expire_time = now + self.ttl
+        songs = tuple(songs)
+        self._remember(key, expire_time, songs)
+
+        try:
+            with SQLiteManager(self.db_path) as sqlite_manager, sqlite_manager.transaction():
+                sqlite_manager.execute_update(
+                    f"INSERT OR REPLACE INTO {self.table} "
+                    f"(query, page, source, payload, expire_time, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                    key + (json.dumps(songs, ensure_ascii=False), expire_time, now))
+                self._evict_disk(sqlite_manager, now)
+        except Exception as e:
+            self.logger.error(f"写入搜索缓存失败: {e}")
+
+    def get_music(self, name: str, page: int = 1, source: str = 'netease') -> Tuple[bool, List[Song]]:
+        """
+        带缓存的 get_music，未命中时请求网络并写入缓存
+
+        Returns:
+            Tuple[bool, List[Song]]: 与 get_music.get_music 相同
+        """
+        songs = self.get(name, page, source)
+        if songs is not None:
+            return True, songs
+
+        ret, songs = get_music(name, page, source)
+        if ret and songs:
+            self.put(name, page, source, songs)
+        return ret, songs
+
+    def clear(self):
+        """清空全部缓存"""
+        with self._lock:
+            self._memory.clear()
+        try:
+            sqlite_manager = SQLiteManager(self.db_path)
+            sqlite_manager.delete_many(self.table, "1 = 1")
+        except Exception as e:
+            self.logger.error(f"清空搜索缓存失败: {e}")
+
+    def _remember(self, key, expire_time, songs):
+        """写入内存缓存，超出容量时淘汰最久未使用的条目"""
+        with self._lock:
+            self._memory[key] = (expire_time, songs)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _evict_disk(self, sqlite_manager: SQLiteManager, now: float):
+        """删除磁盘中已过期的条目，并按最近访问时间淘汰超出容量的条目"""
+        sqlite_manager.delete_many(self.table, "expire_time < ?", (now,))
+        sqlite_manager.delete_many(
+            self.table,
+            f"rowid IN (SELECT rowid FROM {self.table} ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,))
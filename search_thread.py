@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Author: unknown
+@Date: 2026-01-18
+@File: search_thread.py
+"""
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from log_handle import app_logger  # 导入日志配置
+
+
+class SearchThread(QThread):
+    """搜索歌曲的后台线程"""
+    search_finished = pyqtSignal(int, bool, list)  # 发射请求序号、是否成功和歌曲列表
+
+    def __init__(self, request_id, song_name, page, search_cache):
+        super().__init__()
+        self.request_id = request_id
+        self.song_name = song_name
+        self.page = page
+        self.search_cache = search_cache
+        self.logger = app_logger  # 使用全局logger
+
+    def cancel(self):
+        """取消请求：网络请求无法中断，但结果不会再发射"""
+        self.requestInterruption()
+
+    def run(self):
+        """在后台执行搜索请求"""
+        try:
+            ret, song_info = self.search_cache.get_music(self.song_name, self.page)
+        except Exception as e:
+            self.logger.error(f"搜索音乐失败: {e}")
+            ret, song_info = False, []
+
+        if self.isInterruptionRequested():
+            self.logger.debug(f"丢弃过期的搜索结果: {self.song_name}, 页码: {self.page}")
+            return
+        self.search_finished.emit(self.request_id, ret, song_info)
+
+
+class SearchPrefetchThread(QThread):
+    """预取后续页搜索结果及封面的后台线程"""
+    MAX_DEPTH = 3  # 最多预取的页数
+
+    def __init__(self, song_name, pages, search_cache, cover_cache):
+        super().__init__()
+        self.song_name = song_name
+        self.pages = pages[:self.MAX_DEPTH]
+        self.search_cache = search_cache
+        self.cover_cache = cover_cache
+        self.logger = app_logger  # 使用全局logger
+
+    def cancel(self):
+        """取消预取，当前正在进行的请求完成后停止"""
+        self.requestInterruption()
+
+    def run(self):
+        """依次预取每一页，结果写入搜索缓存"""
+        for page in self.pages:
+            if self.isInterruptionRequested():
+                return
+            try:
+                ret, song_info = self.search_cache.get_music(self.song_name, page)
+            except Exception as e:
+                self.logger.error(f"预取搜索结果失败: {e}")
+                return
+            if not ret or not song_info:
+                # 已经没有更多结果
+                return
+            self.logger.debug(f"预取完成: {self.song_name}, 页码: {page}")
+            self.prefetch_covers(song_info)
+
+    def prefetch_covers(self, song_info):
+        """预先下载该页的封面图片"""
+        for item in song_info:
+            if self.isInterruptionRequested():
+                return
+            pic = item.pic
+            try:
+                self.cover_cache.fetch(pic)
+            except Exception as e:
+                self.logger.debug(f"预取封面失败: {e}, URL: {pic}")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Author: unknown
+@Date: 2026-01-18
+@File: song.py
+"""
+
+import re
+import sys
+from typing import NamedTuple, Sequence
+
+from utils import make_song_key
+
+
+def _text(value) -> str:
+    return value if isinstance(value, str) else ("" if value is None else str(value))
+
+
+class Song(NamedTuple):
+    """
+    歌曲信息
+    不可变、可哈希，可以直接作为缓存的键；歌手名经过 intern，同一歌手的多首歌共用一个字符串
+    """
+    title: str
+    author: str
+    pic: str = ""
+    wording: str = ""
+    musicing: str = ""
+    play_url: str = ""
+
+    @classmethod
+    def create(cls, title, author, pic="", wording="", musicing="", play_url="") -> 'Song':
+        """创建歌曲，None 转为空字符串"""
+        return cls(_text(title), sys.intern(_text(author)), _text(pic),
+                   _text(wording), _text(musicing), _text(play_url))
+
+    @classmethod
+    def from_api(cls, item: dict) -> 'Song':
+        """从搜索接口返回的一条数据创建，作词作曲从歌词中提取"""
+        lrc = item.get('lrc') or ""
+        wording_list = re.findall(r'作词 :(.*?)\n', lrc)
+        musicing_list = re.findall(r'作曲 :(.*?)\n', lrc)
+        return cls.create(
+            item.get('title', ""),
+            item.get('author', ""),
+            item.get('pic', ""),
+            wording_list[0] if wording_list else "",
+            musicing_list[0] if musicing_list else "",
+            item.get('url', ""),
+        )
+
+    @classmethod
+    def from_list(cls, values: Sequence) -> 'Song':
+        """从 [title, author, pic, wording, musicing, play_url] 创建（如缓存中的 JSON）"""
+        return cls.create(*values)
+
+    @classmethod
+    def from_row(cls, row) -> 'Song':
+        """从数据库记录创建（收藏表、本地曲库表或全文索引）"""
+        return cls.create(row['title'], row['author'], row['pic'], row['wording'],
+                          row['musicing'], row['play_url'])
+
+    def to_db_dict(self) -> dict:
+        """转换为收藏表的一行"""
+        data = self._asdict()
+        data['song_key'] = self.key
+        return data
+
+    @property
+    def key(self) -> str:
+        """歌曲标识，见 utils.make_song_key"""
+        return make_song_key(self.title, self.author)
+
+    @property
+    def filename(self) -> str:
+        """缓存和下载时使用的文件名"""
+        return f"{self.title}--{self.author}.mp3"
+
+    def sanitized(self) -> 'Song':
+        """去掉歌名和歌手中不能用于文件名的字符"""
+        title = re.sub(r'[^\w\s\u4e00-\u9fff]', '', self.title)
+        author = re.sub(r'[^\w\s\u4e00-\u9fff]', '', self.author)
+        if title == self.title and author == self.author:
+            return self
+        return self._replace(title=title, author=sys.intern(author))
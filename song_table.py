@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Author: unknown
+@Date: 2026-01-18
+@File: song_table.py
+"""
+
+from typing import List, Optional
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+from PyQt5.QtCore import pyqtSignal
+
+from song import Song
+
+# 列号
+COLUMN_ACTION = 0
+COLUMN_TITLE = 1
+COLUMN_AUTHOR = 2
+COLUMN_COVER = 3
+COLUMN_WORDING = 4
+COLUMN_MUSICING = 5
+
+COVER_SIZE = (25, 25)
+COVER_FAILED_ROLE = QtCore.Qt.UserRole + 1  # 封面是否下载失败
+
+
+class SongTableModel(QtCore.QAbstractTableModel):
+    """
+    搜索结果表格的数据模型
+    只保存歌曲列表本身，单元格由视图按需读取，只有可见行才会查询封面缩略图；
+    缩略图未缓存时发出 cover_requested 信号，由调用方排队下载
+    """
+    cover_requested = pyqtSignal(int, str, int)  # 行号、封面 URL、下载优先级
+
+    HEADERS = ["操作", "歌名", "歌手", "专辑", "作词", "作曲"]
+    # 文字列 -> Song 的字段
+    TEXT_COLUMNS = {COLUMN_TITLE: 'title', COLUMN_AUTHOR: 'author',
+                    COLUMN_WORDING: 'wording', COLUMN_MUSICING: 'musicing'}
+
+    def __init__(self, thumb_cache, parent=None):
+        """
+        初始化数据模型
+
+        Args:
+            thumb_cache (ThumbnailCache): 缩略图缓存
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.thumb_cache = thumb_cache
+        self._songs: List[Song] = []
+        self._requested = set()  # 已请求下载的封面 URL
+        self._failed = set()  # 下载失败的封面 URL，本次搜索结果中不再重试
+        self._request_count = 0
+        self._header_font = QtGui.QFont()
+        self._header_font.setBold(True)
+
+    def set_songs(self, songs: List[Song]):
+        """替换全部歌曲"""
+        self.beginResetModel()
+        self._songs = songs
+        self._requested = set()
+        self._failed = set()
+        self.endResetModel()
+
+    def clear(self):
+        self.set_songs([])
+
+    def song(self, row: int) -> Optional[Song]:
+        if 0 <= row < len(self._songs):
+            return self._songs[row]
+        return None
+
+    def cover_ready(self, row: int, url: str):
+        """封面下载完成，刷新对应的单元格"""
+        song = self.song(row)
+        if song is None or song.pic != url:
+            return
+        index = self.index(row, COLUMN_COVER)
+        self.dataChanged.emit(index, index, [QtCore.Qt.DecorationRole])
+
+    def cover_failed(self, row: int, url: str):
+        """封面下载失败，不再视为下载中，单元格显示失败状态"""
+        self._requested.discard(url)
+        self._failed.add(url)
+        song = self.song(row)
+        if song is None or song.pic != url:
+            return
+        index = self.index(row, COLUMN_COVER)
+        self.dataChanged.emit(index, index, [QtCore.Qt.DecorationRole, COVER_FAILED_ROLE])
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._songs)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation != QtCore.Qt.Horizontal:
+            return super().headerData(section, orientation, role)
+        if role == QtCore.Qt.DisplayRole:
+            return self.HEADERS[section]
+        if role == QtCore.Qt.FontRole:
+            return self._header_font
+        return None
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        song = self._songs[index.row()]
+        column = index.column()
+        if role in (QtCore.Qt.DisplayRole, QtCore.Qt.ToolTipRole) and column in self.TEXT_COLUMNS:
+            return getattr(song, self.TEXT_COLUMNS[column])
+        if role == QtCore.Qt.DecorationRole and column == COLUMN_COVER:
+            return self._cover(index.row(), song.pic)
+        if role == COVER_FAILED_ROLE and column == COLUMN_COVER:
+            return song.pic in self._failed
+        return None
+
+    def _cover(self, row: int, url: str) -> Optional[QtGui.QPixmap]:
+        """查询缩略图，未缓存时请求下载；越晚请求（最近显示）的行越先下载"""
+        if not url:
+            return None
+        pixmap = self.thumb_cache.get(url, COVER_SIZE)
+        if pixmap is None and url not in self._requested and url not in self._failed:
+            self._requested.add(url)
+            self._request_count += 1
+            self.cover_requested.emit(row, url, -self._request_count)
+        return pixmap
+
+
+class CoverDelegate(QtWidgets.QStyledItemDelegate):
+    """在单元格中央绘制封面缩略图，未加载或加载失败时显示占位文字"""
+
+    def paint(self, painter, option, index):
+        self.initStyleOption(option, index)
+        style = option.widget.style() if option.widget else QtWidgets.QApplication.style()
+        # 只绘制背景和选中状态，缩略图自己居中绘制
+        option.icon = QtGui.QIcon()
+        style.drawControl(QtWidgets.QStyle.CE_ItemViewItem, option, painter, option.widget)
+
+        pixmap = index.data(QtCore.Qt.DecorationRole)
+        if pixmap is not None and not pixmap.isNull():
+            x = option.rect.x() + (option.rect.width() - pixmap.width()) // 2
+            y = option.rect.y() + (option.rect.height() - pixmap.height()) // 2
+            painter.drawPixmap(x, y, pixmap)
+        else:
+            painter.save()
+            painter.setPen(option.palette.color(QtGui.QPalette.Disabled, QtGui.QPalette.Text))
+            text = "加载失败" if index.data(COVER_FAILED_ROLE) else "加载中..."
+            painter.drawText(option.rect, QtCore.Qt.AlignCenter, text)
+            painter.restore()
+
+    def sizeHint(self, option, index):
+        return QtCore.QSize(COVER_SIZE[0] + 4, COVER_SIZE[1] + 4)
+
+
+class ActionDelegate(QtWidgets.QStyledItemDelegate):
+    """
+    操作列：绘制下载和收藏两个图标按钮，点击时发出信号
+    不为每行创建控件，图标只加载一次
+    """
+    download_clicked = pyqtSignal(int)  # 行号
+    collect_clicked = pyqtSignal(int)  # 行号
+
+    ICON_SIZE = 20
+    SPACING = 4
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # (图标, 提示文字, 信号)
+        self._buttons = [
+            (QtGui.QIcon("./icons/download.png"), "下载当前行歌曲", self.download_clicked),
+            (QtGui.QIcon("./icons/add.png"), "添加到个人收藏夹", self.collect_clicked),
+        ]
+
+    def _button_rects(self, rect):
+        """按钮在单元格中的位置，整体水平居中"""
+        size = self.ICON_SIZE
+        width = len(self._buttons) * size + (len(self._buttons) - 1) * self.SPACING
+        x = rect.x() + (rect.width() - width) // 2
+        y = rect.y() + (rect.height() - size) // 2
+        return [QtCore.QRect(x + i * (size + self.SPACING), y, size, size) for i in range(len(self._buttons))]
+
+    def _button_at(self, rect, pos):
+        for i, button_rect in enumerate(self._button_rects(rect)):
+            if button_rect.contains(pos):
+                return i
+        return -1
+
+    def paint(self, painter, option, index):
+        self.initStyleOption(option, index)
+        style = option.widget.style() if option.widget else QtWidgets.QApplication.style()
+        style.drawControl(QtWidgets.QStyle.CE_ItemViewItem, option, painter, option.widget)
+        for (icon, _, _), rect in zip(self._buttons, self._button_rects(option.rect)):
+            icon.paint(painter, rect)
+
+    def sizeHint(self, option, index):
+        count = len(self._buttons)
+        return QtCore.QSize(count * self.ICON_SIZE + (count + 1) * self.SPACING, self.ICON_SIZE + 4)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QtCore.QEvent.MouseButtonRelease and event.button() == QtCore.Qt.LeftButton:
+            button = self._button_at(option.rect, event.pos())
+            if button >= 0:
+                self._buttons[button][2].emit(index.row())
+                return True
+        elif event.type() == QtCore.QEvent.MouseButtonDblClick:
+            # 双击按钮不触发播放
+            return self._button_at(option.rect, event.pos()) >= 0
+        return super().editorEvent(event, model, option, index)
+
+    def helpEvent(self, event, view, option, index):
+        if event.type() == QtCore.QEvent.ToolTip:
+            button = self._button_at(option.rect, event.pos())
+            if button >= 0:
+                QtWidgets.QToolTip.showText(event.globalPos(), self._buttons[button][1], view)
+                return True
+        return super().helpEvent(event, view, option, index)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Author: unknown
+@Date: 2026-01-18
+@File: sqlite_bench.py
+"""
+
+import logging
+import os
+import tempfile
+import time
+
+from mysqlite import SQLiteManager, WriteBehindQueue, connection_pool
+from log_handle import app_logger  # 导入日志配置
+
+TABLE = 'tb_bench'
+SCHEMA = ("id INTEGER PRIMARY KEY AUTOINCREMENT, "
+          "title VARCHAR(255), "
+          "author VARCHAR(255), "
+          "play_url VARCHAR(255)")
+
+
+def _rows(count):
+    return [{'title': f"title-{i}", 'author': f"author-{i % 50}", 'play_url': f"http://example.com/{i}.mp3"}
+            for i in range(count)]
+
+
+def bench_per_row_commit(db_path, rows):
+    """每条插入单独提交"""
+    db = SQLiteManager(db_path)
+    for row in rows:
+        db.insert_one(TABLE, row)
+    db.close()
+
+
+def bench_transaction(db_path, rows):
+    """所有插入在一个事务中提交"""
+    with SQLiteManager(db_path) as db:
+        with db.transaction():
+            for row in rows:
+                db.insert_one(TABLE, row)
+
+
+def bench_write_behind(db_path, rows):
+    """插入放入后写队列，由后台线程合并提交"""
+    queue = WriteBehindQueue(db_path, max_batch=500)
+    for row in rows:
+        queue.insert(TABLE, row)
+    queue.close()
+
+
+def run(count=2000):
+    """
+    对比逐条提交和批量提交的写入速度
+
+    Args:
+        count (int): 插入的记录数
+    """
+    for name, func in (("逐条提交", bench_per_row_commit),
+                       ("事务批量提交", bench_transaction),
+                       ("后写队列", bench_write_behind)):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, 'bench.db')
+            SQLiteManager(db_path).create_table(TABLE, SCHEMA)
+            start = time.perf_counter()
+            func(db_path, _rows(count))
+            elapsed = time.perf_counter() - start
+            total = SQLiteManager(db_path).execute_query(f"SELECT COUNT(*) FROM {TABLE}")[0][0]
+            connection_pool.close_all()
+            print(f"{name:<8}: {count / elapsed:10.0f} 行/秒 ({total} 行, {elapsed:.3f} 秒)")
+
+
+if __name__ == '__main__':
+    # 逐条写日志会掩盖提交本身的开销
+    app_logger.setLevel(logging.WARNING)
+    run()
@@ -0,0 +1,307 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Author: unknown
+@Date: 2026-01-18
+@File: stream_proxy.py
+"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from audio_download import DownloadCancelled, InvalidAudioError, stream_download
+from log_handle import app_logger  # 导入日志配置
+
+
+class _StreamEntry:
+    """一首正在边下边播的歌曲"""
+
+    def __init__(self, url, cache_path):
+        self.url = url
+        self.cache_path = cache_path
+        self.part_path = cache_path + '.part'
+        self.condition = threading.Condition()
+        self.available = 0  # 已写入临时文件的字节数
+        self.total = 0  # 文件总大小，未知时为0
+        self.started = False  # 是否已收到响应头
+        self.done = False
+        self.error = None
+        self.released = False  # 播放器不再需要，下载线程中止
+        self.finished = threading.Event()  # 下载线程已退出
+        self.info = None  # 识别出的 AudioInfo
+        self.content_hash = ''  # 下载完成后为文件内容的哈希
+
+    def wait_for(self, offset, timeout=30):
+        """
+        等待 offset 处的数据可读
+
+        Returns:
+            bool: 数据可读返回True，下载失败或已到文件末尾返回False
+        """
+        with self.condition:
+            ok = self.condition.wait_for(
+                lambda: self.error is not None or self.done or self.available > offset, timeout)
+            return ok and self.error is None and self.available > offset
+
+    def cancel_if_released(self):
+        """供下载线程轮询：已释放时标记为失败，之后不能再恢复"""
+        with self.condition:
+            if self.released and self.error is None:
+                self.error = DownloadCancelled(self.url)
+                self.condition.notify_all()
+            return self.error is not None
+
+    def read(self, offset, size):
+        """读取已下载的数据，持有锁以免与临时文件的重命名冲突"""
+        with self.condition:
+            path = self.cache_path if self.done else self.part_path
+            size = min(size, self.available - offset)
+            if size <= 0:
+                return b''
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                return f.read(size)
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    """把正在下载的临时文件以 HTTP（支持 Range）的形式提供给播放器"""
+    disable_nagle_algorithm = True
+    proxy = None  # StreamingProxy
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body):
+        entry = self.proxy.get_entry(self.path.lstrip('/'))
+        if entry is None:
+            self.send_error(404)
+            return
+
+        # 等待响应头以获知文件大小
+        with entry.condition:
+            entry.condition.wait_for(lambda: entry.started or entry.done or entry.error is not None, 30)
+        if entry.error is not None or not (entry.started or entry.done):
+            self.send_error(502)
+            return
+
+        total = entry.total
+        start, end = 0, (total - 1 if total else None)
+        match = re.match(r'bytes=(\d*)-(\d*)', self.headers.get('Range', ''))
+        if match and total:
+            if match.group(1):
+                start = int(match.group(1))
+                if match.group(2):
+                    end = min(int(match.group(2)), total - 1)
+            elif match.group(2):
+                # bytes=-N 表示最后 N 个字节
+                start = max(0, total - int(match.group(2)))
+            if start >= total:
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{total}')
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{total}')
+        else:
+            self.send_response(200)
+        self.send_header('Content-Type', entry.info.mime_type if entry.info else 'audio/mpeg')
+        self.send_header('Accept-Ranges', 'bytes')
+        if end is not None:
+            self.send_header('Content-Length', str(end - start + 1))
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        if not send_body:
+            return
+
+        offset = start
+        try:
+            while end is None or offset <= end:
+                if not entry.wait_for(offset):
+                    break
+                limit = 64 * 1024 if end is None else min(64 * 1024, end - offset + 1)
+                data = entry.read(offset, limit)
+                if not data:
+                    break
+                self.wfile.write(data)
+                offset += len(data)
+        except (ConnectionError, OSError):
+            # 播放器跳转或切歌时会主动断开连接
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StreamingProxy(QObject):
+    """
+    本地回环代理，实现边下边播
+    歌曲在后台下载到缓存目录，播放器通过本地 HTTP 地址读取已经下载的部分，
+    下载完成后缓存文件保留，供之后离线播放；
+    播放器不再需要的歌曲（调用 release 或被挤出最近列表）中止下载，不占用带宽
+    """
+    stream_finished = pyqtSignal(str, str)  # 缓存文件路径、内容哈希
+    stream_failed = pyqtSignal(str, bool, str)  # 缓存文件路径、是否为无效音频、错误信息
+    stream_cancelled = pyqtSignal(str)  # 缓存文件路径，释放后中止了下载
+
+    MAX_ENTRIES = 4  # 保留的最近歌曲数
+
+    def __init__(self, host='127.0.0.1', parent=None):
+        super().__init__(parent)
+        self.logger = app_logger  # 使用全局logger
+        self._entries = OrderedDict()  # token -> _StreamEntry
+        self._active = {}  # 缓存路径 -> 下载线程仍在运行的 _StreamEntry
+        self._lock = threading.Lock()
+
+        handler = type('Handler', (_ProxyHandler,), {'proxy': self})
+        self._server = ThreadingHTTPServer((host, 0), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='stream-proxy', daemon=True)
+        self._thread.start()
+        self.logger.info(f"边下边播代理已启动: {self.base_url}")
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def open(self, url, cache_path):
+        """
+        开始下载并返回供播放器使用的本地地址
+
+        Args:
+            url (str): 音频 URL
+            cache_path (str): 下载完成后的缓存路径
+
+        Returns:
+            str: 本地播放地址
+        """
+        token = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16] + '.mp3'
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None and entry.error is None:
+                self._entries.move_to_end(token)
+                return self.base_url + token
+            running = self._active.get(cache_path)
+            if running is not None:
+                with running.condition:
+                    revived = running.error is None
+                    if revived:
+                        # 已释放但尚未中止，继续使用
+                        running.released = False
+                if revived:
+                    self._entries[token] = running
+                    self._evict()
+                    return self.base_url + token
+        if running is not None:
+            # 正在中止的下载会删除临时文件，等它退出后再重新下载
+            running.finished.wait(5)
+
+        with self._lock:
+            entry = _StreamEntry(url, cache_path)
+            self._entries[token] = entry
+            self._active[cache_path] = entry
+            self._evict()
+
+        threading.Thread(target=self._download, args=(entry,), name='stream-download', daemon=True).start()
+        return self.base_url + token
+
+    def release(self, cache_path):
+        """
+        播放器不再需要这首歌曲，中止仍在进行的下载
+
+        Args:
+            cache_path (str): open 时的缓存路径
+        """
+        with self._lock:
+            for token, entry in list(self._entries.items()):
+                if entry.cache_path == cache_path:
+                    del self._entries[token]
+                    self._release(entry)
+
+    def _evict(self):
+        """只保留最近的歌曲，挤出的歌曲中止下载（需持有 _lock）"""
+        while len(self._entries) > self.MAX_ENTRIES:
+            _, entry = self._entries.popitem(last=False)
+            self._release(entry)
+
+    @staticmethod
+    def _release(entry):
+        with entry.condition:
+            if not entry.done:
+                entry.released = True
+
+    def audio_info(self, cache_path):
+        """正在或最近边下边播的歌曲识别出的音频信息"""
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.cache_path == cache_path:
+                    return entry.info
+        return None
+
+    def get_entry(self, token):
+        with self._lock:
+            return self._entries.get(token)
+
+    def _download(self, entry):
+        """后台下载线程"""
+
+        def on_info(info):
+            entry.info = info
+
+        def on_hash(content_hash):
+            entry.content_hash = content_hash
+
+        def on_progress(downloaded, total):
+            with entry.condition:
+                entry.available = downloaded
+                entry.total = total
+                entry.started = True
+                entry.condition.notify_all()
+
+        def on_replaced(size):
+            # 在重命名的同一临界区内标记完成，读取方不会再打开已不存在的临时文件
+            entry.available = entry.total = size
+            entry.done = True
+            entry.condition.notify_all()
+
+        try:
+            stream_download(entry.url, entry.cache_path,
+                            progress_callback=on_progress,
+                            is_cancelled=entry.cancel_if_released,
+                            replace_lock=entry.condition,
+                            info_callback=on_info,
+                            replaced_callback=on_replaced,
+                            hash_callback=on_hash)
+            self.logger.info(f"边下边播缓存完成: {entry.cache_path}")
+            self.stream_finished.emit(entry.cache_path, entry.content_hash)
+        except DownloadCancelled:
+            self.logger.debug(f"边下边播下载已中止: {entry.cache_path}")
+            self.stream_cancelled.emit(entry.cache_path)
+        except Exception as e:
+            with entry.condition:
+                entry.error = e
+                entry.condition.notify_all()
+            invalid = isinstance(e, InvalidAudioError)
+            self.logger.error(f"边下边播下载失败: {e}, URL: {entry.url}")
+            if os.path.exists(entry.part_path):
+                os.remove(entry.part_path)
+            self.stream_failed.emit(entry.cache_path, invalid, str(e))
+        finally:
+            with self._lock:
+                if self._active.get(entry.cache_path) is entry:
+                    del self._active[entry.cache_path]
+            entry.finished.set()
+
+    def shutdown(self):
+        """停止代理服务"""
+        self._server.shutdown()
+        self._server.server_close()
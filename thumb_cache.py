@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Author: unknown
+@Date: 2026-01-18
+@File: thumb_cache.py
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from PyQt5 import QtCore, QtGui
+
+from log_handle import app_logger  # 导入日志配置
+
+
+class ThumbnailCache:
+    """
+    缩略图缓存
+    内存中按字节预算保存已缩放的 QPixmap（LRU），磁盘中保存预缩放的 PNG（同样按容量 LRU 淘汰，
+    访问顺序记录在文件修改时间中，跨会话保留），再次显示同一封面时无需解码原图和缩放
+    只能在 GUI 线程中使用
+    """
+
+    def __init__(self, thumb_dir: str, max_bytes: int = 8 * 1024 * 1024, max_disk_bytes: int = 20 * 1024 * 1024):
+        """
+        初始化缩略图缓存
+
+        Args:
+            thumb_dir (str): 预缩放缩略图的保存目录
+            max_bytes (int): 内存缓存的字节预算
+            max_disk_bytes (int): 磁盘缓存的容量上限（字节）
+        """
+        self.thumb_dir = thumb_dir
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.logger = app_logger  # 使用全局logger
+
+        self._memory = OrderedDict()  # (url, width, height) -> QPixmap
+        self._total_bytes = 0
+        self._disk = OrderedDict()  # 缩略图文件路径 -> 大小，按访问顺序排列
+        self._disk_bytes = 0
+        os.makedirs(self.thumb_dir, exist_ok=True)
+        self._scan_disk()
+
+    def _scan_disk(self):
+        """按修改时间（即上次访问时间）读取已有的缩略图文件"""
+        entries = []
+        for entry in os.scandir(self.thumb_dir):
+            if entry.is_file() and entry.name.endswith('.png'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.path, stat.st_size))
+        for _, path, size in sorted(entries):
+            self._disk[path] = size
+            self._disk_bytes += size
+        self._evict_disk()
+
+    @staticmethod
+    def _pixmap_bytes(pixmap: QtGui.QPixmap) -> int:
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+    def _thumb_path(self, url: str, size: Tuple[int, int]) -> str:
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.thumb_dir, f"{key}_{size[0]}x{size[1]}.png")
+
+    def get(self, url: str, size: Tuple[int, int] = (25, 25)) -> Optional[QtGui.QPixmap]:
+        """
+        查询缩略图，先查内存再查磁盘
+
+        Args:
+            url (str): 封面 URL
+            size (Tuple[int, int]): 目标尺寸
+
+        Returns:
+            Optional[QtGui.QPixmap]: 命中时返回缩略图，否则返回None
+        """
+        key = (url, size[0], size[1])
+        pixmap = self._memory.get(key)
+        if pixmap is not None:
+            self._memory.move_to_end(key)
+            return pixmap
+
+        thumb_path = self._thumb_path(url, size)
+        if not os.path.exists(thumb_path):
+            return None
+        pixmap = QtGui.QPixmap(thumb_path)
+        if pixmap.isNull():
+            return None
+        self._touch_disk(thumb_path)
+        self._remember(key, pixmap)
+        return pixmap
+
+    def from_image(self, url: str, image_path: str, size: Tuple[int, int] = (25, 25)) -> Optional[QtGui.QPixmap]:
+        """
+        从原图生成缩略图，写入内存和磁盘缓存
+
+        Args:
+            url (str): 封面 URL
+            image_path (str): 原图本地路径
+            size (Tuple[int, int]): 目标尺寸
+
+        Returns:
+            Optional[QtGui.QPixmap]: 缩略图，原图无法解码时返回None
+        """
+        pixmap = self.get(url, size)
+        if pixmap is not None:
+            return pixmap
+
+        pixmap = QtGui.QPixmap(image_path)
+        if pixmap.isNull():
+            return None
+        pixmap = pixmap.scaled(
+            size[0], size[1],
+            QtCore.Qt.KeepAspectRatio,
+            QtCore.Qt.SmoothTransformation
+        )
+        thumb_path = self._thumb_path(url, size)
+        if pixmap.save(thumb_path, 'PNG'):
+            self._add_disk(thumb_path)
+        else:
+            self.logger.warning(f"保存缩略图失败: {url}")
+        self._remember((url, size[0], size[1]), pixmap)
+        return pixmap
+
+    def _remember(self, key, pixmap: QtGui.QPixmap):
+        """写入内存缓存，超出字节预算时淘汰最久未使用的条目"""
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._total_bytes -= self._pixmap_bytes(old)
+        self._memory[key] = pixmap
+        self._total_bytes += self._pixmap_bytes(pixmap)
+        while self._total_bytes > self.max_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._total_bytes -= self._pixmap_bytes(evicted)
+
+    def _touch_disk(self, path: str):
+        """记录一次磁盘命中"""
+        if path in self._disk:
+            self._disk.move_to_end(path)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _add_disk(self, path: str):
+        """登记新写入的缩略图文件，超出容量时淘汰最久未使用的文件"""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        self._disk_bytes += size - self._disk.pop(path, 0)
+        self._disk[path] = size
+        self._evict_disk()
+
+    def _evict_disk(self):
+        while self._disk_bytes > self.max_disk_bytes and len(self._disk) > 1:
+            path, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            try:
+                os.remove(path)
+            except OSError as e:
+                self.logger.error(f"删除缩略图失败: {e}")
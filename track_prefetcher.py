@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Author: unknown
+@Date: 2026-01-18
+@File: track_prefetcher.py
+"""
+
+import os
+import threading
+import time
+from typing import List, Tuple
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from audio_download import DownloadCancelled, InvalidAudioError, stream_download
+from song import Song
+from log_handle import app_logger  # 导入日志配置
+
+
+class TrackPrefetcher(QObject):
+    """
+    播放队列的预缓存
+    一个后台线程按播放顺序把即将播放的歌曲下载到缓存目录，切歌时直接播放本地文件；
+    下载速度受带宽预算限制，不挤占正在边下边播的歌曲，队列变化后不再需要的下载立即中止
+    """
+    track_cached = pyqtSignal(object, str, object, str)  # 歌曲、缓存路径、识别出的 AudioInfo、内容哈希
+
+    CHUNK_SIZE = 16 * 1024  # 限速时的块大小，块越小速度越平稳
+
+    def __init__(self, bandwidth: int = 512 * 1024, parent=None):
+        """
+        初始化预缓存
+
+        Args:
+            bandwidth (int): 带宽预算（字节/秒），0 表示不限速
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.bandwidth = bandwidth
+        self.logger = app_logger  # 使用全局logger
+
+        self._condition = threading.Condition()
+        self._targets: List[Tuple[Song, str]] = []  # 按播放顺序排列的 (歌曲, 缓存路径)
+        self._failed = set()  # 下载失败的 URL，本次运行不再重试
+        self._stopped = False
+        self._worker = threading.Thread(target=self._work, name='track-prefetch', daemon=True)
+        self._worker.start()
+
+    def set_upcoming(self, targets: List[Tuple[Song, str]]):
+        """
+        设置需要预缓存的歌曲，替换之前的列表
+
+        Args:
+            targets (List[Tuple[Song, str]]): 按播放顺序排列的 (歌曲, 缓存路径)
+        """
+        with self._condition:
+            self._targets = list(targets)
+            self._condition.notify()
+
+    def shutdown(self, timeout: float = 5):
+        """停止后台线程，未完成的下载丢弃"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self._worker.join(timeout)
+
+    def _is_wanted(self, cache_path: str) -> bool:
+        return not self._stopped and any(path == cache_path for _, path in self._targets)
+
+    def _claim_next(self):
+        """取出第一首尚未缓存的歌曲，没有时阻塞等待"""
+        with self._condition:
+            while not self._stopped:
+                for song, cache_path in self._targets:
+                    if song.play_url and song.play_url not in self._failed and not os.path.exists(cache_path):
+                        return song, cache_path
+                self._condition.wait()
+            return None
+
+    def _work(self):
+        """工作线程主循环"""
+        while True:
+            target = self._claim_next()
+            if target is None:
+                return
+            self._download(*target)
+
+    def _download(self, song: Song, cache_path: str):
+        """下载一首歌曲，按带宽预算限速"""
+        start_time = time.monotonic()
+        state = {'start_bytes': None, 'info': None, 'content_hash': ''}
+
+        def is_cancelled():
+            return not self._is_wanted(cache_path)
+
+        def on_info(info):
+            state['info'] = info
+
+        def on_hash(content_hash):
+            state['content_hash'] = content_hash
+
+        def on_progress(downloaded, total):
+            if not self.bandwidth:
+                return
+            if state['start_bytes'] is None:
+                state['start_bytes'] = downloaded
+            # 读得比预算快时暂停读取，由 TCP 流量控制降低实际下载速度
+            expected = (downloaded - state['start_bytes']) / self.bandwidth
+            while time.monotonic() - start_time < expected and not is_cancelled():
+                time.sleep(min(0.1, expected - (time.monotonic() - start_time)))
+
+        # 先下载到单独的文件，避免与同时边下边播这首歌的代理写同一个临时文件
+        prefetch_path = cache_path + '.prefetch'
+        try:
+            stream_download(song.play_url, prefetch_path,
+                            progress_callback=on_progress,
+                            is_cancelled=is_cancelled,
+                            chunk_size=self.CHUNK_SIZE,
+                            info_callback=on_info,
+                            hash_callback=on_hash)
+        except DownloadCancelled:
+            self.logger.debug(f"预缓存已取消: {cache_path}")
+            return
+        except InvalidAudioError:
+            self.logger.warning(f"预缓存的文件不是有效的音频文件: {song.play_url}")
+            self._failed.add(song.play_url)
+            return
+        except Exception as e:
+            self.logger.error(f"预缓存失败: {e}, URL: {song.play_url}")
+            self._failed.add(song.play_url)
+            return
+
+        if os.path.exists(cache_path):
+            # 期间已经通过边下边播缓存完成
+            os.remove(prefetch_path)
+            return
+        os.replace(prefetch_path, cache_path)
+        self.logger.info(f"预缓存完成: {cache_path}")
+        self.track_cached.emit(song, cache_path, state['info'], state['content_hash'])
@@ -6,11 +6,31 @@
 @File: utils.py
 """
 
+import re
 import requests
 from concurrent.futures import ThreadPoolExecutor
 import os
 from pathlib import Path
 
+import http_client
+
+
+def make_song_key(title: str, author: str) -> str:
+    """
+    歌曲标识：规范化后的歌名和歌手，用于判断是否为同一首歌
+
+    Args:
+        title (str): 歌名
+        author (str): 歌手
+
+    Returns:
+        str: 歌曲标识
+    """
+    def normalize(text):
+        return re.sub(r'\s+', ' ', (text or '').strip()).casefold()
+
+    return f"{normalize(title)}\x1f{normalize(author)}"
+
 
 def download_image(url: str, save_path: str) -> bool:
     """
@@ -24,15 +44,15 @@ def download_image(url: str, save_path: str) -> bool:
         bool: 下载是否成功
     """
     try:
-        response = requests.get(url, stream=True)
-        response.raise_for_status()  # 检查请求是否成功
+        with http_client.get(url, stream=True) as response:
+            response.raise_for_status()  # 检查请求是否成功
 
-        # 确保目录存在
-        Path(save_path).parent.mkdir(parents=True, exist_ok=True)
+            # 确保目录存在
+            Path(save_path).parent.mkdir(parents=True, exist_ok=True)
 
-        with open(save_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+            with open(save_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=8192):
+                    f.write(chunk)
 
         return True
     except requests.RequestException as e:
@@ -67,24 +87,5 @@ def batch_download_images(image_urls: list, save_dir: str, max_workers: int = 5)
     return results
 
 
-def is_binary_file(file_path, sample_size=1024):
-    """
-    检测文件是否为二进制文件（音频文件）
-    :param file_path: 文件路径
-    :param sample_size: 检测样本大小
-    :return: True如果是二进制文件，False如果是文本文件
-    """
-    try:
-        with open(file_path, 'rb') as f:
-            chunk = f.read(sample_size)
-            if not chunk:
-                return False  # 空文件
-
-            # 检查是否包含null字节或其他二进制特征
-            text_chars = bytearray({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)) - {0x7f})
-            return bool(chunk.translate(None, text_chars))
-    except:
-        return False
-
 if __name__ == '__main__':
     download_image("http://p2.music.126.net/34YW1QtKxJ_3YnX9ZzKhzw==/2946691234868155.jpg?param=300x300", "./image/2946691234868155.jpg")
\ No newline at end of file